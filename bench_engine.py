@@ -0,0 +1,66 @@
+#
+# bench_engine.py
+# read_process_csv의 C 엔진 / pyarrow 엔진 처리량을 비교하는 스크립트입니다.
+# 실제 검사 장비 CSV와 같은 구조(앞부분 리포트 줄 + SNumber/Stamp/PC/Pass + 측정 컬럼)의
+# 가상 데이터를 만들어 각 엔진으로 여러 번 읽고 중앙값 시간을 출력합니다.
+#
+# 사용법: python bench_engine.py [행 수] [반복 횟수]
+
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from csv_process import read_process_csv
+
+
+def make_station_csv(n_rows, prefix='Fw', n_measures=20, seed=0):
+    """검사 장비 CSV와 같은 형식의 가상 데이터를 bytes로 만드는 함수"""
+    rng = np.random.default_rng(seed)
+    stamps = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 7 * 86400, n_rows), unit='s')
+    data = {
+        'SNumber': [f'="SN{x:07d}"' for x in rng.integers(0, n_rows // 3, n_rows)],
+        f'{prefix}Stamp': stamps.strftime('%Y-%m-%d %H:%M:%S'),
+        f'{prefix}PC': [f'PC{x}' for x in rng.integers(0, 8, n_rows)],
+        f'{prefix}Pass': rng.choice(['O', 'X'], n_rows, p=[0.9, 0.1]),
+    }
+    for i in range(n_measures):
+        data[f'Meas{i}'] = rng.random(n_rows).round(4)
+
+    buf = io.StringIO()
+    buf.write('Report,,,\nLine,A,,\n')
+    pd.DataFrame(data).to_csv(buf, index=False)
+    return buf.getvalue().encode('utf-8')
+
+
+def bench(raw, process, engine, full_columns, repeat):
+    """지정한 엔진으로 repeat번 읽은 시간의 중앙값(초)을 반환하는 함수"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        # BytesIO도 UploadedFile처럼 getvalue()를 제공합니다.
+        read_process_csv(io.BytesIO(raw), process, full_columns=full_columns,
+                         use_cache=False, engine=engine)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    raw = make_station_csv(n_rows)
+    size_mb = len(raw) / 1024 / 1024
+    print(f"rows={n_rows:,} size={size_mb:.1f}MB repeat={repeat}")
+
+    for full_columns in (False, True):
+        mode = 'full' if full_columns else 'projection'
+        for engine in ('c', 'pyarrow'):
+            elapsed = bench(raw, 'Fw', engine, full_columns, repeat)
+            print(f"{mode:10s} {engine:8s} {elapsed:6.2f}s {size_mb / elapsed:7.1f}MB/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#
+# check_buckets.py
+# 시간 / 교대 / 주 단위 수율(csv_bucket)의 가성/진성불량 건수가 일별 리포트와 같은지 확인하는 스크립트입니다.
+# 재검사(FAIL 후 몇 분 뒤 PASS)가 시간/교대 경계를 넘는 가상 검사 CSV를 만들고,
+# 지그별로 모든 구간의 건수를 더한 값이 analyze_process_table(일별) 건수와 같은지 비교합니다.
+#
+# 사용법: python check_buckets.py [시리얼 수]
+
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+
+from csv_bucket import bucket_partials, summarize_buckets
+from csv_process import analyze_process_table, read_process_csv
+
+MEASURES = ['total_test', 'pass', 'false_defect', 'true_defect']
+
+
+def make_retest_csv(n_serials, prefix='Fw', seed=0):
+    """시리얼마다 FAIL 후 1~20분 뒤 같은 지그에서 PASS 하는 재검사 CSV를 bytes로 만드는 함수"""
+    rng = np.random.default_rng(seed)
+    fail_at = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 7 * 86400, n_serials), unit='s')
+    pass_at = fail_at + pd.to_timedelta(rng.integers(60, 20 * 60, n_serials), unit='s')
+    serials = [f'="SN{x:07d}"' for x in range(n_serials)]
+    jigs = [f'PC{x}' for x in rng.integers(0, 4, n_serials)]
+    data = pd.DataFrame({
+        'SNumber': serials * 2,
+        f'{prefix}Stamp': fail_at.append(pass_at).strftime('%Y-%m-%d %H:%M:%S'),
+        f'{prefix}PC': jigs * 2,
+        f'{prefix}Pass': ['X'] * n_serials + ['O'] * n_serials,
+    })
+
+    buf = io.StringIO()
+    buf.write('Report,,,\nLine,A,,\n')
+    data.to_csv(buf, index=False)
+    return buf.getvalue().encode('utf-8')
+
+
+def make_boundary_csv(prefix='Fw'):
+    """시간 경계(10:55 -> 11:05)와 교대 경계(19:55 -> 20:05)를 넘는 재검사 두 건의 CSV를 만드는 함수"""
+    rows = [('A', '2025-01-01 10:55:00', 'X'), ('A', '2025-01-01 11:05:00', 'O'),
+            ('B', '2025-01-01 19:55:00', 'X'), ('B', '2025-01-01 20:05:00', 'O')]
+    lines = ['Report,,,', 'Line,A,,', f'SNumber,{prefix}Stamp,{prefix}PC,{prefix}Pass']
+    lines += [f'{sn},{stamp},PC1,{result}' for sn, stamp, result in rows]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def jig_totals(table):
+    """컬럼형 결과의 건수를 지그별로 더하는 함수"""
+    return table['cells'].groupby('jig')[MEASURES].sum()
+
+
+def run_check(raw, process='Fw'):
+    """구간 단위별 지그 합계가 일별 리포트와 같은지 {단위: bool}로 반환하는 함수"""
+    df = read_process_csv(io.BytesIO(raw), process, use_cache=False)
+    expected = jig_totals(analyze_process_table(df, process))
+    partials = bucket_partials(df, process)
+    return {granularity: jig_totals(summarize_buckets(partials, granularity)[0]).equals(expected)
+            for granularity in ('hour', 'shift', 'day', 'week')}
+
+
+def main():
+    n_serials = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    ok = True
+    for name, raw in (('boundary', make_boundary_csv()), (f'retest x{n_serials:,}', make_retest_csv(n_serials))):
+        results = run_check(raw)
+        print(f"{name}: " + ", ".join(f"{granularity}={same}" for granularity, same in results.items()))
+        ok = ok and all(results.values())
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#
+# check_incremental.py
+# 로컬 폴더 파일(open_local_file의 mmap)로 증분 분석을 실행해 전체 분석 결과와 같은지 확인하는 스크립트입니다.
+# 가상 검사 CSV를 임시 파일에 나눠 기록하면서 (마지막 줄은 줄바꿈 없이 기록 중인 상태 포함)
+# 매번 analyze_process_incremental을 호출하고, 최종 결과를 같은 내용의 analyze_process_table 결과와 비교합니다.
+#
+# 사용법: python check_incremental.py [행 수] [나눌 횟수]
+
+import io
+import os
+import sys
+import tempfile
+
+from bench_engine import make_station_csv
+from csv_process import analyze_process_incremental, analyze_process_table, read_process_csv
+from csv_source import open_local_file
+from csv_yield import table_to_summary
+
+
+def run_check(n_rows, n_parts, process='Fw'):
+    """파일에 행을 나눠 추가하면서 증분 분석한 결과가 전체 분석과 같은지 반환하는 함수"""
+    raw = make_station_csv(n_rows, prefix=process, n_measures=2)
+    header_end = raw.index(b'SNumber')
+    header_end = raw.index(b'\n', header_end) + 1
+    # 헤더 뒤를 n_parts 조각으로 나누되, 조각 끝은 줄 중간일 수도 있습니다.
+    cuts = [header_end + (len(raw) - header_end) * i // n_parts for i in range(1, n_parts)] + [len(raw)]
+
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        state = None
+        written = 0
+        for cut in [header_end] + cuts:
+            with open(path, 'ab') as f:
+                f.write(raw[written:cut])
+            written = cut
+            with open_local_file(path) as local_file:
+                table, state = analyze_process_incremental(local_file, process, state, chunksize=max(n_rows // 7, 1))
+
+        expected = analyze_process_table(read_process_csv(io.BytesIO(raw), process, use_cache=False), process)
+        return table_to_summary(table) == table_to_summary(expected)
+    finally:
+        os.remove(path)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    n_parts = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    ok = run_check(n_rows, n_parts)
+    print(f"rows={n_rows:,} parts={n_parts} incremental(mmap) == full: {ok}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
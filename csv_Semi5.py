@@ -1,155 +1,21 @@
-# csv_Semi.py
+# csv_Semi5.py
+# 공정별 키워드/컬럼 설정은 csv_process.PROCESS_SPECS['SemiAssy']에 정의되어 있으며,
+# 헤더 탐색(인코딩 자동 시도 포함)과 분석은 csv_process의 공통 함수가 처리합니다.
 
-import pandas as pd
-import numpy as np
-import io
-from datetime import datetime
 import warnings
 
-warnings.filterwarnings('ignore')
+from csv_process import read_process_csv, analyze_process_data
+from csv_process import clean_quoted_string as clean_string_format
 
-def clean_string_format(value):
-    """다양한 형태의 문자열 포맷을 정리하는 함수"""
-    if pd.isna(value):
-        return value
-    
-    value_str = str(value).strip()
-    
-    if value_str.startswith('="') and value_str.endswith('"'):
-        return value_str[2:-1]
-    
-    if value_str.startswith('""') and value_str.endswith('""'):
-        return value_str[2:-2]
-    
-    if value_str.startswith('"') and value_str.endswith('"') and len(value_str) > 2:
-        return value_str[1:-1]
-    
-    return value_str
+warnings.filterwarnings('ignore')
 
 def read_csv_with_dynamic_header_for_Semi(uploaded_file):
     """SemiAssy 데이터에 맞는 키워드로 헤더를 찾아 DataFrame을 로드하는 함수"""
-    try:
-        encodings = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr', 'latin-1']
-        
-        for encoding in encodings:
-            try:
-                file_content = io.BytesIO(uploaded_file.getvalue())
-                df_temp = pd.read_csv(file_content, header=None, nrows=20, encoding=encoding)
-                
-                keywords = ['SNumber', 'SemiAssyStartTime', 'SemiAssyMaxSolarVolt', 'SemiAssyPass']
-                
-                header_row = None
-                for i, row in df_temp.iterrows():
-                    row_values = [str(x).strip() for x in row.values if pd.notna(x) and str(x).strip() != '']
-                    
-                    matched_keywords = sum(1 for kw in keywords if any(kw in str(val) for val in row_values))
-                    
-                    if matched_keywords >= len(keywords):
-                        header_row = i
-                        break
-                
-                if header_row is not None:
-                    file_content.seek(0)
-                    # 헤더를 찾았을 때 skipinitialspace=True 옵션 추가
-                    df = pd.read_csv(file_content, header=header_row, encoding=encoding, skipinitialspace=True)
-                    
-                    # 로드 후, 컬럼 이름에서 불필요한 공백 제거
-                    df.columns = df.columns.str.strip()
-                    
-                    # 첫 번째 컬럼이 인덱스인 경우 제거 (헤더의 첫 열이 비어있는 경우)
-                    if df.columns[0] == '' or pd.isna(df.columns[0]) or str(df.columns[0]).strip() == '':
-                        df = df.iloc[:, 1:].copy()
-                    
-                    semi_columns = [col for col in df.columns if 'SemiAssy' in str(col)]
-                    if len(semi_columns) > 0:
-                        return df
-                
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                print(f"Error with encoding {encoding}: {e}")
-                continue
-        
-        return None
-            
-    except Exception as e:
-        print(f"Final error reading CSV: {e}")
-        return None
+    return read_process_csv(uploaded_file, 'SemiAssy')
 
 def analyze_Semi_data(df):
     """SemiAssy 데이터의 분석 로직을 담고 있는 함수"""
     try:
-        required_columns = ['SNumber', 'SemiAssyStartTime', 'SemiAssyPass']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            # streamlit_app.py로 에러 메시지를 전달하기 위해 Exception 발생
-            raise ValueError(f"필수 컬럼이 없습니다: {missing_columns}")
-        
-        for col in df.columns:
-            df[col] = df[col].apply(clean_string_format)
-        
-        df['SemiAssyStartTime'] = pd.to_datetime(df['SemiAssyStartTime'], format='%Y%m%d%H%M%S', errors='coerce')
-        df['PassStatusNorm'] = df['SemiAssyPass'].fillna('').astype(str).str.strip().str.upper()
-        
-        df_valid = df[df['SemiAssyStartTime'].notna()].copy()
-        
-        if len(df_valid) == 0:
-            raise ValueError("유효한 날짜 데이터가 없습니다.")
-
-        if 'SemiAssyMaxSolarVolt' in df_valid.columns and not df_valid['SemiAssyMaxSolarVolt'].isna().all():
-            jig_column = 'SemiAssyMaxSolarVolt'
-        elif 'BatadcPC' in df_valid.columns and not df_valid['BatadcPC'].isna().all():
-            jig_column = 'BatadcPC'
-        else:
-            df_valid['DEFAULT_JIG'] = 'SemiAssy_JIG'
-            jig_column = 'DEFAULT_JIG'
-        
-        summary_data = {}
-        
-        for jig, group in df_valid.groupby(jig_column):
-            if pd.isna(jig) or str(jig).strip() == '':
-                continue
-            
-            if group['SemiAssyStartTime'].dt.date.dropna().empty:
-                continue
-            
-            for d, day_group in group.groupby(group['SemiAssyStartTime'].dt.date):
-                if pd.isna(d):
-                    continue
-                
-                date_iso = pd.to_datetime(d).strftime("%Y-%m-%d")
-                
-                pass_sns_series = day_group.groupby('SNumber')['PassStatusNorm'].apply(lambda x: 'O' in x.tolist())
-                pass_sns = pass_sns_series[pass_sns_series].index.tolist()
-                
-                pass_count = (day_group['PassStatusNorm'] == 'O').sum()
-                
-                false_defect_df = day_group[(day_group['PassStatusNorm'] == 'X') & (day_group['SNumber'].isin(pass_sns))]
-                false_defect_count = false_defect_df.shape[0]
-                false_defect_sns = false_defect_df['SNumber'].unique().tolist()
-                
-                true_defect_df = day_group[(day_group['PassStatusNorm'] == 'X') & (~day_group['SNumber'].isin(pass_sns))]
-                true_defect_count = true_defect_df.shape[0]
-                
-                total_test = len(day_group)
-                fail_count = false_defect_count + true_defect_count
-                rate = 100 * pass_count / total_test if total_test > 0 else 0
-                
-                if jig not in summary_data:
-                    summary_data[jig] = {}
-                summary_data[jig][date_iso] = {
-                    'total_test': total_test,
-                    'pass': pass_count,
-                    'false_defect': false_defect_count,
-                    'true_defect': true_defect_count,
-                    'fail': fail_count,
-                    'pass_rate': f"{rate:.1f}%",
-                    'false_defect_sns': false_defect_sns
-                }
-        
-        all_dates = sorted(list(df_valid['SemiAssyStartTime'].dt.date.dropna().unique()))
-        return summary_data, all_dates
+        return analyze_process_data(df, 'SemiAssy')
     except Exception as e:
-        print(f"Error in analyze_Semi_data: {e}")
-        raise # 상위 호출자에게 예외를 다시 던져 Streamlit이 오류를 표시하게 함
+        raise ValueError(f"분석 중 오류가 발생했습니다: {e}")
@@ -0,0 +1,164 @@
+#
+# csv_batch.py
+# 여러 CSV 파일(예: 일주일치 일별 Fw 파일)을 ProcessPoolExecutor로 동시에 읽습니다.
+# 파일 하나를 워커 하나가 맡아 헤더 탐색/정리/타입 변환까지 끝낸 뒤,
+# 결과 DataFrame은 이어 붙이고(read_process_files), 스트리밍 부분 집계는 합칩니다(analyze_process_files).
+# 여러 공정을 한 번에 분석할 때는 공정 하나를 워커 하나가 맡아 읽기+분석까지 수행합니다(iter_process_analyses).
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from csv_process import (get_process_spec, read_process_csv, stream_process_partials, analyze_process_table,
+                         DEFAULT_CHUNKSIZE)
+from csv_source import open_local_file
+from csv_yield import merge_partials, yield_table
+
+# 파일마다 가성불량 시리얼 순서용 행 번호를 겹치지 않게 나누는 간격
+FILE_ROW_STRIDE = 1 << 40
+
+
+def _file_payload(file):
+    """업로드 파일은 (이름, bytes), 로컬 파일 경로는 (이름, 경로)로 바꾸는 함수 (워커로 전달용)"""
+    if isinstance(file, str):
+        return os.path.basename(file), file
+    return file.name, bytes(file.getvalue())
+
+
+@contextlib.contextmanager
+def _open_payload(payload):
+    """워커에서 payload를 업로드 파일 형태(getvalue())로 여는 함수"""
+    if isinstance(payload, str):
+        with open_local_file(payload) as local_file:
+            yield local_file
+    else:
+        yield io.BytesIO(payload)
+
+
+def _read_file_job(payload, spec, full_columns):
+    """워커 프로세스에서 파일 하나를 읽는 함수"""
+    with _open_payload(payload) as source:
+        return read_process_csv(source, spec, full_columns=full_columns)
+
+
+def _partials_file_job(payload, spec, chunksize, row_offset):
+    """워커 프로세스에서 파일 하나의 부분 집계를 계산하는 함수"""
+    with _open_payload(payload) as source:
+        return stream_process_partials(source, spec, chunksize, row_offset)
+
+
+def _run_file_jobs(job, payloads, job_args, max_workers):
+    """파일마다 job을 실행하고 입력 순서대로 결과를 반환하는 함수 (파일이 하나면 현재 프로세스에서 실행)"""
+    max_workers = min(len(payloads), max_workers or os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [job(payload, *args) for payload, args in zip(payloads, job_args)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(job, payload, *args) for payload, args in zip(payloads, job_args)]
+        return [future.result() for future in futures]
+
+
+def read_process_files(files, process, full_columns=False, max_workers=None):
+    """여러 파일을 병렬로 읽어 하나의 DataFrame으로 합치는 함수
+
+    files는 업로드 파일 객체 또는 로컬 파일 경로의 리스트이며, 각 행의 원본 파일 이름은
+    SourceFile 컬럼에 남깁니다. 읽을 수 있는 파일이 하나도 없으면 None을 반환합니다.
+    """
+    return _read_payloads([_file_payload(file) for file in files], get_process_spec(process),
+                          full_columns, max_workers)
+
+
+def _read_payloads(named, spec, full_columns=False, max_workers=None):
+    """(이름, payload) 목록을 읽어 하나의 DataFrame으로 합치는 함수 (read_process_files 본체)"""
+    if not named:
+        return None
+
+    results = _run_file_jobs(_read_file_job, [payload for _, payload in named],
+                             [(spec, full_columns)] * len(named), max_workers)
+
+    frames = []
+    for (name, _), df in zip(named, results):
+        if df is not None:
+            frames.append(df.assign(SourceFile=name))
+    if not frames:
+        return None
+    if len(frames) == 1:
+        frames[0]['SourceFile'] = frames[0]['SourceFile'].astype('category')
+        return frames[0]
+
+    # 파일마다 카테고리 목록이 달라 concat 후에는 일반 컬럼이 되므로 다시 category로 맞춥니다.
+    categorical = [col for col in frames[0].columns
+                   if all(col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames)]
+    combined = pd.concat(frames, ignore_index=True)
+    for col in categorical + ['SourceFile']:
+        combined[col] = combined[col].astype('category')
+
+    # 파일별 NaT 처리 행 수는 합산합니다 (concat은 attrs가 모두 같을 때만 유지).
+    nat_coerced = {}
+    for df in frames:
+        for col, count in df.attrs.get('nat_coerced', {}).items():
+            nat_coerced[col] = nat_coerced.get(col, 0) + count
+    combined.attrs['nat_coerced'] = nat_coerced
+    return combined
+
+
+def analyze_process_files(files, process, chunksize=DEFAULT_CHUNKSIZE, max_workers=None):
+    """여러 파일을 병렬로 스트리밍 집계해 컬럼형 결과(yield_table)를 계산하는 함수
+
+    워커는 파일별 부분 집계 테이블만 돌려주고, 부모 프로세스에서 merge_partials로 합칩니다.
+    헤더를 찾은 파일이 하나도 없으면 None을 반환합니다.
+    """
+    spec = get_process_spec(process)
+    payloads = [payload for _, payload in (_file_payload(file) for file in files)]
+    if not payloads:
+        return None
+
+    job_args = [(spec, chunksize, index * FILE_ROW_STRIDE) for index in range(len(payloads))]
+    results = _run_file_jobs(_partials_file_job, payloads, job_args, max_workers)
+    if not any(found for _, found in results):
+        return None
+
+    partials = merge_partials([p for p, found in results if found])
+    if spec['require_dates'] and (partials is None or len(partials) == 0):
+        raise ValueError("유효한 날짜 데이터가 없습니다.")
+    return yield_table(partials)
+
+
+def _analyze_process_job(named, spec):
+    """워커 프로세스에서 한 공정의 파일들을 읽고 분석하는 함수 -> (DataFrame, 컬럼형 결과)"""
+    # 공정 사이에서 이미 병렬로 실행 중이므로 파일은 이 워커 안에서 차례로 읽습니다.
+    df = _read_payloads(named, spec, max_workers=1)
+    if df is None:
+        return None, None
+    return df, analyze_process_table(df, spec)
+
+
+def iter_process_analyses(jobs, max_workers=None):
+    """여러 공정을 공정마다 워커 하나에서 읽고 분석해, 끝나는 순서대로 결과를 내보내는 함수
+
+    jobs는 {키: (공정, 파일 목록)}이며, (키, df, 컬럼형 결과, 오류)를 끝난 순서대로 yield 합니다.
+    한 공정에서 오류가 나도 나머지 공정은 계속 분석하고, 오류는 네 번째 값으로 전달합니다.
+    파일을 읽을 수 없으면 df와 결과가 None입니다.
+    """
+    payloads = {key: ([_file_payload(file) for file in files], get_process_spec(process))
+                for key, (process, files) in jobs.items()}
+    max_workers = min(len(payloads), max_workers or os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        for key, (named, spec) in payloads.items():
+            try:
+                yield (key, *_analyze_process_job(named, spec), None)
+            except Exception as e:
+                yield key, None, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_analyze_process_job, named, spec): key for key, (named, spec) in payloads.items()}
+        for future in as_completed(futures):
+            try:
+                yield (futures[future], *future.result(), None)
+            except Exception as e:
+                yield futures[future], None, None, e
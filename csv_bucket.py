@@ -0,0 +1,131 @@
+#
+# csv_bucket.py
+# 일별 리포트 외에 시간 / 교대 / 일 / 주 단위 수율을 계산합니다.
+# 원본 데이터는 한 번만 (지그, 기본 단위 시각, 시리얼) 부분 집계로 만들고(bucket_partials),
+# 집계 단위를 바꿀 때는 부분 집계의 시각만 새 구간 시작 시각으로 옮겨 다시 합칩니다(summarize_buckets).
+# 가성/진성불량은 부분 집계를 만들 때 일별 리포트 기준으로 행마다 한 번만 판정해 n_false 건수로 담으므로,
+# 재검사가 시간/교대 경계를 넘어도 구간별 건수의 합은 일별 리포트와 같습니다.
+# 야간 교대처럼 자정을 넘는 구간은 교대가 시작된 날짜에 속합니다.
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from csv_process import get_process_spec, prepare_process_frame
+from csv_yield import yield_partials, regroup_partials, yield_table, false_defect_rows
+
+# (교대 이름, 시작 시각) - 다음 교대가 시작되기 전까지가 한 교대입니다.
+DEFAULT_SHIFTS = (('주간', '08:00'), ('야간', '20:00'))
+
+# 집계 단위 -> 표시 이름
+GRANULARITIES = {'hour': '시간', 'shift': '교대', 'day': '일', 'week': '주'}
+
+
+def _start_minutes(start):
+    """'HH:MM' 형식의 교대 시작 시각을 자정 기준 분으로 바꾸는 함수"""
+    hour, _, minute = start.strip().partition(':')
+    try:
+        hour, minute = int(hour), int(minute or 0)
+    except ValueError:
+        raise ValueError(f"교대 시작 시각 형식이 잘못되었습니다: {start.strip()} (예: 08:00)")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"교대 시작 시각이 범위를 벗어났습니다: {start.strip()}")
+    return hour * 60 + minute
+
+
+def parse_shift_calendar(text):
+    """'주간=08:00, 야간=20:00' 형식 문자열을 ((이름, 'HH:MM'), ...) 교대 설정으로 바꾸는 함수"""
+    shifts = []
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        name, sep, start = item.partition('=')
+        if not sep or not name.strip():
+            raise ValueError(f"교대 설정 형식이 잘못되었습니다: {item.strip()} (예: 주간=08:00)")
+        minutes = _start_minutes(start)
+        shifts.append((name.strip(), f"{minutes // 60:02d}:{minutes % 60:02d}"))
+    if not shifts:
+        raise ValueError("교대가 하나 이상 필요합니다.")
+    if len({start for _, start in shifts}) != len(shifts):
+        raise ValueError("교대 시작 시각이 중복되었습니다.")
+    return tuple(shifts)
+
+
+def base_freq(shifts=DEFAULT_SHIFTS):
+    """모든 집계 단위로 다시 합칠 수 있는 기본 시각 단위를 구하는 함수 (교대가 정시에 시작하면 '60min')"""
+    step = math.gcd(60, *(_start_minutes(start) for _, start in shifts))
+    return f"{step}min"
+
+
+def bucket_partials(df, process, shifts=DEFAULT_SHIFTS):
+    """read_process_csv로 읽은 DataFrame을 (지그, 기본 단위 시각, 시리얼) 부분 집계로 만드는 함수
+
+    이 결과만 보관하면 summarize_buckets로 단위를 바꿔도 원본을 다시 읽거나 정리하지 않습니다.
+    """
+    spec = get_process_spec(process)
+    df, jig_column = prepare_process_frame(df, spec)
+    false_flags = false_defect_rows(df, spec['sn_col'], spec['stamp_col'], jig_column,
+                                    retest_window=spec['retest_window'])
+    return yield_partials(df, spec['sn_col'], spec['stamp_col'], jig_column, freq=base_freq(shifts),
+                          attempts=True, false_flags=false_flags)
+
+
+def _bucket_starts(times, granularity, shifts):
+    """기본 단위 시각들이 속한 구간의 시작 시각을 구하는 함수"""
+    times = pd.DatetimeIndex(times)
+    if granularity == 'hour':
+        return times.floor('h')
+    days = times.normalize()
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        # 월요일 시작 주
+        return days - pd.to_timedelta(days.weekday, unit='D')
+    if granularity != 'shift':
+        raise ValueError(f"지원하지 않는 집계 단위입니다: {granularity}")
+
+    starts = np.array(sorted(_start_minutes(start) for _, start in shifts))
+    minutes = np.asarray((times - days) // pd.Timedelta(minutes=1))
+    index = np.searchsorted(starts, minutes, side='right') - 1
+    # 첫 교대 시작 전 시각은 전날 시작한 마지막 교대(자정을 넘는 야간 교대)에 속합니다.
+    days = days - pd.to_timedelta((index < 0).astype(np.int64), unit='D')
+    return days + pd.to_timedelta(starts[index], unit='min')
+
+
+def _bucket_label(start, granularity, shift_names):
+    """구간 시작 시각으로 리포트 컬럼 이름을 만드는 함수"""
+    if granularity == 'hour':
+        return start.strftime('%m/%d %H시')
+    if granularity == 'shift':
+        return f"{start.strftime('%m/%d')} {shift_names[start.strftime('%H:%M')]}"
+    if granularity == 'week':
+        return f"{start.strftime('%y%m%d')} 주"
+    return start.strftime('%y%m%d')
+
+
+def rebucket_partials(partials, granularity, shifts=DEFAULT_SHIFTS):
+    """부분 집계의 시각을 granularity 구간 시작 시각으로 옮겨 다시 합치는 함수 (건수만 더하고 판정은 다시 하지 않음)"""
+    if partials is None or len(partials) == 0:
+        return partials
+    # 서로 다른 시각(시간 단위면 수백 개)에 대해서만 구간을 계산합니다.
+    codes, times = pd.factorize(partials['date'])
+    starts = np.asarray(_bucket_starts(times, granularity, shifts))
+    return regroup_partials(partials.assign(date=starts[codes]))
+
+
+def summarize_buckets(partials, granularity='day', shifts=DEFAULT_SHIFTS):
+    """bucket_partials 결과를 granularity 단위로 집계해 (컬럼형 결과, buckets)를 반환하는 함수
+
+    컬럼형 결과는 yield_table 형식이되 'date' 컬럼이 구간 시작 시각이고,
+    buckets는 시간순 [(구간 시작 시각, 표시 이름)] 목록입니다.
+    """
+    moved = rebucket_partials(partials, granularity, shifts)
+    table = yield_table(moved)
+    if moved is None or len(moved) == 0:
+        return table, []
+
+    shift_names = {start: name for name, start in shifts}
+    starts = pd.DatetimeIndex(moved['date'].unique()).sort_values()
+    buckets = [(start, _bucket_label(start, granularity, shift_names)) for start in starts]
+    return table, buckets
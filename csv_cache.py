@@ -0,0 +1,151 @@
+#
+# csv_cache.py
+# 파싱/정리/타입 변환이 끝난 DataFrame을 디스크에 Parquet로 캐시합니다.
+# 키는 업로드 파일 내용의 해시 + 공정 설정(spec)이므로, 같은 파일을 다시 올리면
+# 헤더 탐색/정리/날짜 파싱 없이 바로 로드되고, 설정이 바뀌면 자동으로 다시 파싱됩니다.
+# 캐시 디렉터리 전체 크기가 CACHE_MAX_BYTES를 넘으면 오래 사용하지 않은 파일부터 지웁니다.
+# 분석이 끝난 원본 행도 같은 디렉터리에 내려두고(spill_frame), 세션에는 가벼운 핸들만 보관합니다.
+
+import hashlib
+import json
+import os
+import uuid
+
+import pandas as pd
+
+# 캐시 형식이 바뀌면 값을 올려 기존 캐시를 무효화합니다.
+CACHE_VERSION = 2
+
+CACHE_DIR = os.environ.get('CSV_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.csv_cache'))
+CACHE_MAX_BYTES = int(os.environ.get('CSV_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+CACHE_SUFFIX = '.parquet'
+
+# 숫자 값의 category 컬럼은 Parquet에서 원래 dtype으로 복원되지 않으므로 목록을 메타데이터에 따로 저장합니다.
+_CATEGORY_META_KEY = b'csv_cache.categories'
+# df.attrs(예: NaT 처리 행 수)도 함께 저장합니다.
+_ATTRS_META_KEY = b'csv_cache.attrs'
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    CACHE_ENABLED = True
+except ImportError:
+    CACHE_ENABLED = False
+
+
+def spec_fingerprint(spec):
+    """공정 설정 dict를 캐시 키에 사용할 짧은 해시로 바꾸는 함수"""
+    return hashlib.sha1(repr(sorted(spec.items())).encode('utf-8')).hexdigest()[:16]
+
+
+def cache_key(raw, spec, variant=''):
+    """파일 내용 해시 + 공정 설정 + 읽기 방식(variant)으로 캐시 키를 만드는 함수"""
+    content = hashlib.sha1(raw).hexdigest()
+    return f"{content}-{spec_fingerprint(spec)}-{variant}-v{CACHE_VERSION}"
+
+
+def _cache_path(key, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, key + CACHE_SUFFIX)
+
+
+def load_cached_frame(key, cache_dir=None):
+    """캐시된 DataFrame을 읽는 함수 (없거나 읽을 수 없으면 None)"""
+    if not CACHE_ENABLED:
+        return None
+    path = _cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        table = pq.read_table(path)
+        df = table.to_pandas()
+        meta = table.schema.metadata or {}
+        for col in json.loads(meta.get(_CATEGORY_META_KEY, b'[]')):
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        df.attrs.update(json.loads(meta.get(_ATTRS_META_KEY, b'{}')))
+        # LRU 정리를 위해 마지막 사용 시각을 갱신합니다.
+        os.utime(path, None)
+        return df
+    except Exception:
+        return None
+
+
+def store_cached_frame(key, df, cache_dir=None, max_bytes=None):
+    """DataFrame을 캐시에 저장하고 용량을 정리하는 함수 (저장 실패는 무시)"""
+    if not CACHE_ENABLED or df is None:
+        return False
+    cache_dir = cache_dir or CACHE_DIR
+    path = _cache_path(key, cache_dir)
+    # 동시에 같은 파일을 저장하는 경우를 위해 임시 파일에 쓴 뒤 교체합니다.
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        categories = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+        meta = dict(table.schema.metadata or {})
+        meta[_CATEGORY_META_KEY] = json.dumps(categories).encode('utf-8')
+        meta[_ATTRS_META_KEY] = json.dumps(df.attrs).encode('utf-8')
+        pq.write_table(table.replace_schema_metadata(meta), tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    evict_cache(cache_dir, CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+    return True
+
+
+def evict_cache(cache_dir=None, max_bytes=CACHE_MAX_BYTES):
+    """캐시 디렉터리 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 파일부터 지우는 함수"""
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.name.endswith(CACHE_SUFFIX):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear_cache(cache_dir=None):
+    """캐시 파일을 모두 지우는 함수"""
+    return evict_cache(cache_dir, 0)
+
+
+def spill_frame(key, df, cache_dir=None):
+    """DataFrame을 캐시 디렉터리에 Parquet로 내려두고 가벼운 핸들(dict)을 반환하는 함수
+
+    세션에는 핸들만 보관하고 행이 필요할 때 load_spilled_frame으로 읽습니다.
+    같은 key의 파일이 이미 있으면(다른 세션이 같은 파일을 분석) 다시 쓰지 않습니다.
+    pyarrow가 없거나 저장에 실패하면 DataFrame을 핸들에 그대로 담습니다.
+    """
+    handle = {'key': key, 'rows': len(df), 'nbytes': int(df.memory_usage(deep=True).sum())}
+    if CACHE_ENABLED and os.path.exists(_cache_path(key, cache_dir)):
+        os.utime(_cache_path(key, cache_dir), None)
+        return handle
+    if store_cached_frame(key, df, cache_dir):
+        return handle
+    return {**handle, 'key': None, 'frame': df}
+
+
+def load_spilled_frame(handle, cache_dir=None):
+    """spill_frame 핸들의 DataFrame을 읽는 함수 (캐시 정리로 파일이 지워졌으면 None)"""
+    if handle.get('frame') is not None:
+        return handle['frame']
+    return load_cached_frame(handle['key'], cache_dir)
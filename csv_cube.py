@@ -0,0 +1,168 @@
+#
+# csv_cube.py
+# 분석할 때 (공정, 지그, 날짜, 시간)별 총 테스트/PASS/가성불량/진성불량 건수를 큐브로 만들어 둡니다.
+# 화면에서 필터/합계/피벗을 바꿀 때는 원본 행이나 analyze_* 함수를 다시 거치지 않고
+# 큐브를 잘라내거나(slice_cube) 더하는 것(rollup_cube)만으로 결과를 만듭니다.
+# 연속 측정값 지그(예: PcbMaxIrPwr)는 라벨이 수천 개라 조밀한 배열은 대부분 0이 되므로,
+# 건수가 있는 (공정, 지그, 날짜, 시간) 칸만 긴 형식 표(cells)로 보관하고 펼칠 때만 0을 채웁니다.
+# 가성불량 판정은 일별 리포트와 같으므로 시간 축을 합치면 summary_data 건수와 일치합니다.
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from csv_process import get_process_spec, prepare_process_frame
+from csv_yield import PASS_CODE, FAIL_CODE, false_defect_rows
+
+CUBE_DIMS = ('process', 'jig', 'date', 'hour')
+CUBE_MEASURES = ('total_test', 'pass', 'false_defect', 'true_defect')
+
+# 축 / 지표 -> 표시 이름 (fail, pass_rate는 건수로부터 계산)
+DIM_LABELS = {'process': '공정', 'jig': '지그', 'date': '날짜', 'hour': '시간'}
+MEASURE_LABELS = {'total_test': '총 테스트 수', 'pass': 'PASS', 'false_defect': '가성불량',
+                  'true_defect': '진성불량', 'fail': 'FAIL', 'pass_rate': '수율(%)'}
+
+
+def _sorted_labels(values):
+    """축 라벨을 정렬하는 함수 (공정마다 지그 타입이 달라 비교할 수 없으면 문자열 기준)"""
+    try:
+        return sorted(values)
+    except TypeError:
+        return sorted(values, key=str)
+
+
+def build_cube(df, process):
+    """read_process_csv로 읽은 DataFrame으로 공정 하나의 큐브를 만드는 함수
+
+    반환값은 {'process': [공정], 'jig': [...], 'date': [date...], 'hour': [0..23], 'cells': DataFrame} 이며
+    cells는 건수가 있는 칸만 담은 (CUBE_DIMS + CUBE_MEASURES) 컬럼의 긴 형식 표입니다.
+    """
+    spec = get_process_spec(process)
+    df, jig_column = prepare_process_frame(df, spec)
+    stamps = df[spec['stamp_col']]
+
+    false_flags = false_defect_rows(df, spec['sn_col'], spec['stamp_col'], jig_column,
+                                    retest_window=spec['retest_window'])
+    codes = df['PassCode'].to_numpy()
+
+    # 날짜 또는 지그가 없는 행은 리포트에 나오지 않으므로 큐브에서도 제외합니다.
+    valid = stamps.notna().to_numpy() & df[jig_column].notna().to_numpy()
+    jig_codes, jig_values = pd.factorize(df[jig_column].to_numpy(dtype=object)[valid])
+    date_codes, date_values = pd.factorize(stamps[valid].dt.normalize(), sort=True)
+    hours = stamps[valid].dt.hour.to_numpy(dtype=np.int64)
+
+    jigs = _sorted_labels(jig_values)
+    jig_position = {jig: i for i, jig in enumerate(jigs)}
+    jig_rank = np.array([jig_position[jig] for jig in jig_values], dtype=np.int64)
+
+    # 칸 번호는 (지그, 날짜, 시간) 순이므로 np.unique 결과도 같은 순서로 정렬됩니다.
+    n_date = len(date_values)
+    flat = (jig_rank[jig_codes] * n_date + date_codes) * 24 + hours
+    keys, cell_codes = np.unique(flat, return_inverse=True)
+    is_false = false_flags[valid]
+    is_fail = codes[valid] == FAIL_CODE
+    dates = list(pd.DatetimeIndex(date_values).date)
+    day_keys = keys // 24
+
+    # 축 컬럼은 category(라벨 코드)로, 건수는 int32로 보관해 칸 하나가 수십 바이트를 넘지 않게 합니다.
+    cells = pd.DataFrame({
+        'process': pd.Categorical.from_codes(np.zeros(len(keys), dtype=np.int8), [spec['name']]),
+        'jig': pd.Categorical.from_codes(day_keys // max(n_date, 1), pd.Index(jigs, dtype=object)),
+        'date': pd.Categorical.from_codes(day_keys % max(n_date, 1), pd.Index(dates, dtype=object)),
+        'hour': (keys % 24).astype(np.int8),
+        'total_test': np.bincount(cell_codes, minlength=len(keys)),
+        'pass': np.bincount(cell_codes, weights=codes[valid] == PASS_CODE, minlength=len(keys)),
+        'false_defect': np.bincount(cell_codes, weights=is_false, minlength=len(keys)),
+        'true_defect': np.bincount(cell_codes, weights=is_fail & ~is_false, minlength=len(keys)),
+    })
+    cells[list(CUBE_MEASURES)] = cells[list(CUBE_MEASURES)].astype(np.int32)
+
+    return {
+        'process': [spec['name']],
+        'jig': jigs,
+        'date': dates,
+        'hour': list(range(24)),
+        'cells': cells,
+    }
+
+
+def merge_cubes(cubes):
+    """여러 큐브(보통 공정별)를 합치는 함수 (칸 목록을 이어 붙이고 축 라벨은 합집합)
+
+    공정마다 지그 라벨이 달라도 공유 축을 만들지 않으므로 크기는 각 큐브 칸 수의 합입니다.
+    """
+    cubes = [cube for cube in cubes if cube is not None]
+    if not cubes:
+        return None
+    labels = {
+        'process': list(dict.fromkeys(name for cube in cubes for name in cube['process'])),
+        'jig': _sorted_labels(set(jig for cube in cubes for jig in cube['jig'])),
+        'date': sorted(set(d for cube in cubes for d in cube['date'])),
+        'hour': list(range(24)),
+    }
+    frames = [cube['cells'] for cube in cubes]
+    cells = pd.concat(frames, ignore_index=True)
+    for dim in ('process', 'jig', 'date'):
+        # 공정마다 카테고리가 달라 concat이 object로 바꾼 컬럼을 라벨 합집합 카테고리로 되돌립니다.
+        cells[dim] = union_categoricals([frame[dim] for frame in frames])
+    if sum(len(cube['process']) for cube in cubes) > len(labels['process']):
+        # 같은 공정의 큐브가 여러 개면 같은 칸을 더합니다.
+        cells = cells.groupby(list(CUBE_DIMS), sort=False, as_index=False)[list(CUBE_MEASURES)].sum()
+    return {**labels, 'cells': cells}
+
+
+def slice_cube(cube, **filters):
+    """축별 라벨 목록으로 큐브를 잘라내는 함수 (예: slice_cube(cube, jig=['PC1'], hour=range(8, 20)))"""
+    result = dict(cube)
+    cells = cube['cells']
+    for dim, wanted in filters.items():
+        if wanted is None:
+            continue
+        wanted = set(wanted)
+        cells = cells[cells[dim].isin(wanted)]
+        result[dim] = [label for label in cube[dim] if label in wanted]
+    result['cells'] = cells
+    return result
+
+
+def _label_positions(column, labels):
+    """칸 목록의 축 컬럼 값을 labels 안의 위치로 바꾸는 함수 (category는 카테고리마다 한 번만 찾음)"""
+    labels = pd.Index(labels, dtype=object)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return labels.get_indexer(column.cat.categories)[column.cat.codes.to_numpy()]
+    return labels.get_indexer(column)
+
+
+def rollup_cube(cube, keep):
+    """keep에 없는 축을 모두 더해 (keep 축 라벨 목록, 합계 배열)을 반환하는 함수
+
+    합계 배열은 keep 축 라벨의 모든 조합에 대해 만들어지며, 건수가 없는 칸은 0입니다.
+    """
+    labels = [cube[dim] for dim in keep]
+    measures = list(CUBE_MEASURES)
+    if not keep:
+        return labels, cube['cells'][measures].sum().to_numpy(dtype=np.int64)
+    positions = [_label_positions(cube['cells'][dim], dim_labels) for dim, dim_labels in zip(keep, labels)]
+    shape = tuple(len(dim_labels) for dim_labels in labels)
+    flat = np.ravel_multi_index(positions, shape) if len(cube['cells']) else np.array([], dtype=np.int64)
+    size = int(np.prod(shape))
+    summed = np.stack([np.bincount(flat, weights=cube['cells'][col].to_numpy(), minlength=size)
+                       for col in measures], axis=-1).astype(np.int64)
+    return labels, summed.reshape(shape + (len(measures),))
+
+
+def cube_to_frame(cube, keep):
+    """keep 축 기준으로 합친 건수를 긴 형식 DataFrame으로 만드는 함수 (fail, pass_rate 포함)"""
+    labels, summed = rollup_cube(cube, keep)
+    index = pd.MultiIndex.from_product(labels, names=list(keep)) if keep else pd.RangeIndex(1)
+    frame = pd.DataFrame(summed.reshape(-1, len(CUBE_MEASURES)), index=index, columns=list(CUBE_MEASURES))
+    frame['fail'] = frame['false_defect'] + frame['true_defect']
+    frame['pass_rate'] = (100 * frame['pass'] / frame['total_test'].where(frame['total_test'] > 0)).round(1)
+    return frame
+
+
+def pivot_cube(cube, index, columns=None, measure='total_test'):
+    """큐브를 index x columns 표로 펼치는 함수 (건수가 0인 칸도 0으로 표시, pass_rate는 빈칸)"""
+    keep = [index] if columns is None else [index, columns]
+    frame = cube_to_frame(cube, keep)[measure]
+    return frame.to_frame() if columns is None else frame.unstack(columns)
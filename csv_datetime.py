@@ -0,0 +1,192 @@
+#
+# csv_datetime.py
+# *Stamp / *StartTime 컬럼의 날짜 형식을 샘플로 한 번만 추론하고 공정별로 기억합니다.
+# 'YYYYMMDDhhmmss', 'YYYY-MM-DD hh:mm:ss' 같은 고정 폭 형식은 문자열을 행마다 strptime 하지 않고
+# 숫자 자리 연산으로 한 번에 변환하며, 형식에 맞지 않는 행만 pandas로 다시 변환합니다.
+
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# 형식 추론에 사용할 샘플 값 개수
+FORMAT_SAMPLE_SIZE = 100
+GUESS_SAMPLE_SIZE = 10
+
+# 공정 이름 -> 마지막으로 추론된 날짜 형식
+_FORMAT_HINTS = {}
+
+# 고정 폭 빠른 경로에서 지원하는 형식 지시자와 자리 수
+_FIXED_WIDTHS = {'Y': 4, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+_TOKEN = re.compile(r'%(.)')
+
+# 'YYYY-MM-DD hh:mm:ss'처럼 구분자가 있는 ISO 8601 계열 형식은 pandas가 이미 C 코드로 빠르게
+# 변환하므로 그대로 맡기고, 빠른 경로는 'YYYYMMDDhhmmss', 'MM/DD/YYYY ...' 등에만 사용합니다.
+_PANDAS_ISO = re.compile(r'%Y([-/\\. ])%m(\1%d([ T]%H(:%M(:%S)?)?)?)?$')
+
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+_NAT = np.iinfo(np.int64).min
+
+
+def _fixed_layout(fmt):
+    """형식 문자열을 (전체 폭, [(지시자, 위치, 폭)], [(위치, 문자)])로 분해하는 함수 (고정 폭이 아니면 None)"""
+    fields, literals = [], []
+    pos = 0
+    index = 0
+    for match in _TOKEN.finditer(fmt):
+        for char in fmt[index:match.start()]:
+            literals.append((pos, ord(char)))
+            pos += 1
+        directive = match.group(1)
+        if directive not in _FIXED_WIDTHS:
+            return None
+        fields.append((directive, pos, _FIXED_WIDTHS[directive]))
+        pos += _FIXED_WIDTHS[directive]
+        index = match.end()
+    for char in fmt[index:]:
+        if ord(char) > 127:
+            return None
+        literals.append((pos, ord(char)))
+        pos += 1
+    if not any(directive == 'Y' for directive, _, _ in fields):
+        return None
+    return pos, fields, literals
+
+
+def _components_to_datetime(parts, valid):
+    """연/월/일/시/분/초 정수 배열을 datetime64[us] 정수로 바꾸는 함수 (범위를 벗어나면 valid=False)"""
+    year = parts.get('Y')
+    month = parts.get('m', np.ones_like(year))
+    day = parts.get('d', np.ones_like(year))
+    hour = parts.get('H', np.zeros_like(year))
+    minute = parts.get('M', np.zeros_like(year))
+    second = parts.get('S', np.zeros_like(year))
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_ok = (month >= 1) & (month <= 12)
+    dim = _DAYS_IN_MONTH[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+    valid = valid & (year >= 1) & month_ok & (day >= 1) & (day <= dim) \
+        & (hour <= 23) & (minute <= 59) & (second <= 59)
+
+    # 그레고리력 날짜 -> 1970-01-01 기준 일 수 (civil-from-days의 역변환)
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    days = era * 146097 + doe - 719468
+
+    micros = ((days * 86400 + hour * 3600 + minute * 60 + second) * 1_000_000)
+    return np.where(valid, micros, _NAT), valid
+
+
+def _fast_parse_strings(values, layout):
+    """고정 폭 문자열 배열을 자리 연산으로 변환하는 함수 -> (datetime64[us] 정수, 변환 성공 mask)"""
+    width, fields, literals = layout
+    n = len(values)
+    try:
+        # 한 자리 더 넓게 변환해 마지막 바이트가 비어 있으면 길이가 정확히 width인 값입니다.
+        raw = values.astype(f'S{width + 1}')
+    except UnicodeEncodeError:
+        # ASCII가 아닌 값은 형식에 맞을 수 없으므로 비워 두고 pandas 재변환 대상으로 남깁니다.
+        ascii_only = np.array([not isinstance(value, str) or value.isascii() for value in values])
+        raw = np.where(ascii_only, values, '').astype(f'S{width + 1}')
+
+    chars = raw.view(np.uint8).reshape(n, width + 1)
+    valid = (chars[:, width] == 0) & (chars[:, width - 1] != 0)
+    for pos, code in literals:
+        valid &= chars[:, pos] == code
+
+    parts = {}
+    for directive, pos, size in fields:
+        block = chars[:, pos:pos + size] - np.uint8(ord('0'))
+        valid &= (block <= 9).all(axis=1)
+        parts[directive] = block.astype(np.int64) @ (10 ** np.arange(size - 1, -1, -1, dtype=np.int64))
+
+    return _components_to_datetime(parts, valid)
+
+
+def _fast_parse_numbers(values, layout):
+    """숫자로 읽힌 'YYYYMMDDhhmmss' 형식 값을 정수 나눗셈으로 변환하는 함수"""
+    width, fields, _ = layout
+    numbers = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(numbers) & (numbers >= 10 ** (width - 1)) & (numbers < 10 ** width) \
+        & (numbers == np.floor(numbers))
+    integers = np.where(valid, numbers, 0).astype(np.int64)
+
+    parts = {}
+    for directive, pos, size in fields:
+        shift = 10 ** (width - pos - size)
+        parts[directive] = (integers // shift) % (10 ** size)
+    return _components_to_datetime(parts, valid)
+
+
+def _sample_strings(series, sample_size=FORMAT_SAMPLE_SIZE):
+    """형식 추론용으로 결측이 아닌 앞부분 값 몇 개를 문자열로 꺼내는 함수"""
+    sample = series.head(sample_size * 10).dropna().head(sample_size)
+    if len(sample) == 0:
+        sample = series.dropna().head(sample_size)
+    if pd.api.types.is_numeric_dtype(sample):
+        return [str(int(value)) if float(value).is_integer() else str(value) for value in sample]
+    return [str(value).strip() for value in sample]
+
+
+def _format_fits(sample, fmt):
+    """샘플 값의 절반 이상이 형식에 맞는지 확인하는 함수"""
+    if not sample:
+        return False
+    parsed = pd.to_datetime(pd.Series(sample), format=fmt, errors='coerce')
+    return parsed.notna().sum() * 2 >= len(sample)
+
+
+def infer_datetime_format(series, process=None):
+    """샘플 값으로 날짜 형식을 추론하는 함수 (같은 공정에서 이전에 추론한 형식이 맞으면 재사용, 실패 시 None)"""
+    sample = _sample_strings(series)
+    hint = _FORMAT_HINTS.get(process)
+    if hint is not None and _format_fits(sample, hint):
+        return hint
+
+    # 형식 추측은 값마다 비용이 크므로 앞쪽 일부만 사용하고, 검증은 샘플 전체로 합니다.
+    guesses = Counter(fmt for fmt in (guess_datetime_format(value) for value in sample[:GUESS_SAMPLE_SIZE]) if fmt)
+    for fmt, _ in guesses.most_common():
+        if _format_fits(sample, fmt):
+            if process is not None:
+                _FORMAT_HINTS[process] = fmt
+            return fmt
+    return None
+
+
+def parse_timestamps(series, fmt=None, process=None):
+    """날짜 컬럼을 datetime64로 변환하고 (변환 결과, NaT로 처리된 행 수)를 반환하는 함수
+
+    fmt가 없으면 infer_datetime_format으로 형식을 정하고, 고정 폭 형식이면 빠른 경로로 변환합니다.
+    빠른 경로에서 형식이 맞지 않은 행만 pd.to_datetime(format=fmt)로 다시 변환하므로 결과는
+    pd.to_datetime(series, format=fmt, errors='coerce')와 같습니다.
+    """
+    present = series.notna().to_numpy()
+    if fmt is None:
+        fmt = infer_datetime_format(series, process)
+    layout = _fixed_layout(fmt) if fmt is not None and not _PANDAS_ISO.match(fmt) else None
+
+    if layout is None:
+        parsed = pd.to_datetime(series, format=fmt, errors='coerce')
+    else:
+        if pd.api.types.is_numeric_dtype(series):
+            if layout[2]:
+                # 구분자가 있는 형식은 숫자로 읽힐 수 없으므로 pandas에 맡깁니다.
+                micros, ok = np.full(len(series), _NAT, dtype=np.int64), np.zeros(len(series), dtype=bool)
+            else:
+                micros, ok = _fast_parse_numbers(series.to_numpy(dtype=np.float64, na_value=np.nan), layout)
+        else:
+            micros, ok = _fast_parse_strings(series.to_numpy(dtype=object), layout)
+
+        parsed = pd.Series(micros.view('datetime64[us]'), index=series.index, name=series.name)
+        retry = present & ~ok
+        if retry.any():
+            retried = pd.to_datetime(series[retry], format=fmt, errors='coerce')
+            parsed[retry] = retried.astype('datetime64[us]')
+
+    n_coerced = int((present & parsed.isna().to_numpy()).sum())
+    return parsed, n_coerced
@@ -0,0 +1,125 @@
+#
+# csv_drift.py
+# 지그별 수율이 나빠지기 시작하는 것을 일별 표를 읽기 전에 알리기 위한 변화 감지기입니다.
+# analyze_* 함수들이 만든 컬럼형 결과(csv_yield.yield_table)의 (지그, 구간)별 건수만 입력으로 받고,
+# 지그/지표마다 기준 불량률, EWMA, 이항 CUSUM 값 몇 개만 상태로 보관합니다.
+# 한 번 반영한 구간은 다시 계산하지 않으므로 실시간 로그를 새로고침할 때마다 새 구간만 처리합니다.
+
+import math
+
+import pandas as pd
+
+# 지표 -> 불량 건수로 더할 컬럼 (분모는 total_test)
+DRIFT_METRICS = {
+    'fail': ['false_defect', 'true_defect'],
+    'false_defect': ['false_defect'],
+}
+METRIC_LABELS = {'fail': 'FAIL률', 'false_defect': '가성불량률'}
+
+DRIFT_WARMUP = 5        # 기준 불량률을 정하는 처음 구간 수 (지그별)
+DRIFT_WARMUP_TESTS = 5000   # 기준 불량률에 필요한 최소 테스트 수 (구간 수와 둘 다 채워야 감시 시작)
+CUSUM_SHIFT = 2.0       # CUSUM이 감지하려는 불량률 변화 (기준의 몇 배)
+CUSUM_H = 8.0           # CUSUM 경보 한계 (로그 우도비)
+EWMA_LAMBDA = 0.2       # 경보와 함께 보여줄 평활 불량률(EWMA) 가중치
+
+ALERT_COLUMNS = ['jig', 'metric', 'date', 'rate', 'baseline', 'ewma', 'cusum', 'provisional']
+
+
+def new_drift_state():
+    """빈 변화 감지 상태를 만드는 함수"""
+    # watermark: 마지막으로 반영한(닫힌) 구간 시각, jigs: 지그 -> 지표 -> 통계
+    return {'watermark': None, 'jigs': {}}
+
+
+def _new_metric_state():
+    """지그/지표 하나의 통계 초기값"""
+    # date/total/rate는 마지막으로 반영한 구간 값 (경보 표시용)
+    return {'buckets': 0, 'base_total': 0, 'base_count': 0, 'watching': False, 'ewma': None, 'cusum': 0.0,
+            'date': None, 'total': 0, 'rate': None}
+
+
+def _baseline(metric_state):
+    """워밍업 구간으로 정한 기준 불량률 (0 또는 1이면 분산이 0이 되지 않도록 보정)"""
+    return (metric_state['base_count'] + 0.5) / (metric_state['base_total'] + 1)
+
+
+def _step(metric_state, date, total, count):
+    """구간 하나의 (총 테스트 수, 불량 건수)를 반영한 새 통계를 반환하는 함수 (O(1))"""
+    metric_state = dict(metric_state)
+    metric_state['date'], metric_state['total'], metric_state['rate'] = date, total, count / total
+    if not metric_state['watching']:
+        # 워밍업 동안은 기준 불량률만 쌓습니다.
+        metric_state['base_total'] += total
+        metric_state['base_count'] += count
+        metric_state['buckets'] += 1
+        metric_state['watching'] = (metric_state['buckets'] >= DRIFT_WARMUP
+                                    and metric_state['base_total'] >= DRIFT_WARMUP_TESTS)
+        return metric_state
+
+    # 이항 CUSUM: 불량률이 기준(base)에서 CUSUM_SHIFT배가 되었다는 가설의 로그 우도비를 누적
+    base = _baseline(metric_state)
+    shifted = min(base * CUSUM_SHIFT, 0.999)
+    llr = count * math.log(shifted / base) + (total - count) * math.log((1 - shifted) / (1 - base))
+    metric_state['cusum'] = max(0.0, metric_state['cusum'] + llr)
+    previous = base if metric_state['ewma'] is None else metric_state['ewma']
+    metric_state['ewma'] = EWMA_LAMBDA * metric_state['rate'] + (1 - EWMA_LAMBDA) * previous
+    return metric_state
+
+
+def _alarm(metric_state):
+    """CUSUM이 경보 한계를 넘었는지 판정하는 함수 (불량률이 올라가는 쪽만 경보)
+
+    드문 불량에서는 정규 근사 한계를 쓰는 EWMA 경보가 오경보가 많아, EWMA는 표시용으로만 씁니다.
+    """
+    return metric_state['ewma'] is not None and metric_state['cusum'] > CUSUM_H
+
+
+def _bucket_counts(cells):
+    """셀 행마다 (지그, 구간, 총 테스트 수, {지표: 불량 건수})를 만드는 함수"""
+    counts = {metric: cells[cols].sum(axis=1).tolist() for metric, cols in DRIFT_METRICS.items()}
+    for row, (jig, date, total) in enumerate(zip(cells['jig'].tolist(), cells['date'], cells['total_test'].tolist())):
+        yield jig, date, total, {metric: counts[metric][row] for metric in DRIFT_METRICS}
+
+
+def detect_drift(table, state=None):
+    """컬럼형 결과의 새 구간을 반영해 (경보 DataFrame, state)를 반환하는 함수
+
+    state는 이전 호출이 반환한 dict입니다 (없으면 처음부터). 가장 최근 구간은 아직 기록 중일 수
+    있으므로 상태에는 반영하지 않고, 그 구간까지 포함했을 때의 경보만 provisional=True로 표시합니다.
+    이미 반영한 구간(watermark 이전)의 셀은 건너뛰므로 호출 비용은 새 구간 수에 비례합니다.
+    결과의 구간이 모두 watermark 이전이면(다른 파일을 분석한 경우) 처음부터 다시 시작합니다.
+    """
+    cells = table['cells']
+    cells = cells[cells['total_test'] > 0]
+    if state is None or (len(cells) and state['watermark'] is not None
+                         and cells['date'].max() <= state['watermark']):
+        state = new_drift_state()
+    if len(cells) == 0:
+        return pd.DataFrame(columns=ALERT_COLUMNS), state
+
+    latest = cells['date'].max()
+    if state['watermark'] is not None:
+        cells = cells[cells['date'] > state['watermark']]
+    cells = cells.sort_values('date', kind='stable')
+
+    jigs = dict(state['jigs'])
+    closed = (cells['date'] < latest).to_numpy()
+    # 닫힌 구간은 상태에 반영하고, 기록 중인 마지막 구간은 임시로만 계산
+    provisional = {}
+    for target, rows in ((jigs, closed), (provisional, ~closed)):
+        for jig, date, total, counts in _bucket_counts(cells[rows]):
+            jig_state = jigs.get(jig) or {metric: _new_metric_state() for metric in DRIFT_METRICS}
+            target[jig] = {metric: _step(jig_state[metric], date, total, counts[metric]) for metric in DRIFT_METRICS}
+
+    # 새 구간이 없는 지그도 경보 상태가 유지되도록 상태에 있는 모든 지그를 판정
+    alerts = []
+    for jig in {**jigs, **provisional}:
+        jig_state = provisional.get(jig, jigs.get(jig))
+        for metric in DRIFT_METRICS:
+            metric_state = jig_state[metric]
+            if _alarm(metric_state):
+                alerts.append((jig, metric, metric_state['date'], metric_state['rate'], _baseline(metric_state),
+                               metric_state['ewma'], metric_state['cusum'], jig in provisional))
+
+    watermark = cells.loc[closed, 'date'].max() if closed.any() else state['watermark']
+    return pd.DataFrame(alerts, columns=ALERT_COLUMNS), {'watermark': watermark, 'jigs': jigs}
@@ -0,0 +1,83 @@
+#
+# csv_encoding.py
+# 업로드 파일의 인코딩을 BOM과 바이트 패턴으로 한 번만 판별합니다.
+# 인코딩마다 전체 파일을 다시 파싱하지 않고, 비 ASCII 바이트가 처음 나타나는
+# 구간의 샘플만 디코딩해 보고 결정하며, 공정별로 마지막 결과를 기억합니다.
+# latin-1처럼 어떤 바이트든 디코딩되는 인코딩은 기억하지 않고 항상 마지막 후보로만 사용합니다.
+
+import codecs
+import re
+
+# 샘플 디코딩에 사용할 최대 바이트 수
+SNIFF_SAMPLE_SIZE = 64 * 1024
+
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+# 공정 이름 -> 마지막으로 판별된 인코딩 (엄격한 인코딩만 기록)
+_ENCODING_HINTS = {}
+
+# 다른 인코딩의 바이트열이 우연히 디코딩되는 일이 거의 없어 항상 먼저 시도하는 인코딩
+# (UTF-8 한글 샘플은 cp949로도 디코딩되는 경우가 있지만, cp949 한글은 UTF-8로 디코딩되지 않습니다.)
+_SELF_VALIDATING = ('utf-8',)
+
+
+def _is_lenient(encoding):
+    """모든 바이트 값이 디코딩되어 판별에 쓸 수 없는 인코딩(latin-1 등)인지 확인하는 함수"""
+    try:
+        bytes(range(256)).decode(encoding)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _sample_around_non_ascii(raw, sample_size):
+    """첫 번째 비 ASCII 바이트가 포함된 줄부터 sample_size 만큼을 잘라 반환하는 함수 (없으면 None)"""
+    match = _NON_ASCII.search(raw)
+    if match is None:
+        return None
+
+    start = raw.rfind(b'\n', 0, match.start()) + 1
+    end = min(start + sample_size, len(raw))
+    if end < len(raw):
+        # 멀티바이트 문자가 잘리지 않도록 마지막 줄바꿈까지만 사용
+        last_newline = raw.rfind(b'\n', start, end)
+        if last_newline > start:
+            end = last_newline
+    return bytes(raw[start:end])
+
+
+def sniff_encoding(raw, candidates, process=None, sample_size=SNIFF_SAMPLE_SIZE):
+    """BOM/바이트 패턴으로 파일 인코딩을 판별하는 함수
+
+    candidates 순서대로 샘플 디코딩을 시도하되, 같은 공정에서 이전에 판별된 인코딩이
+    있으면 UTF-8 다음으로 시도합니다. 모든 바이트가 디코딩되는 인코딩(latin-1 등)은
+    엄격한 후보가 모두 실패했을 때만 쓰고, 다음 파일의 힌트로 기록하지 않습니다.
+    """
+    if raw[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+        encoding = 'utf-8-sig'
+    else:
+        candidates = [enc for enc in candidates if enc not in (None, 'utf-8-sig')] or ['utf-8']
+        strict = [enc for enc in candidates if not _is_lenient(enc)]
+        hint = _ENCODING_HINTS.get(process)
+        if hint in strict:
+            strict.remove(hint)
+            first = [enc for enc in strict if enc in _SELF_VALIDATING]
+            strict = first + [hint] + [enc for enc in strict if enc not in first]
+        candidates = strict + [enc for enc in candidates if _is_lenient(enc)]
+
+        sample = _sample_around_non_ascii(raw, sample_size)
+        if sample is None:
+            # ASCII만 있는 파일은 어떤 후보로도 같게 읽히므로 힌트를 바꾸지 않습니다.
+            return candidates[0]
+        encoding = candidates[0]
+        for candidate in candidates:
+            try:
+                sample.decode(candidate)
+            except UnicodeDecodeError:
+                continue
+            encoding = candidate
+            break
+
+    if process is not None and not _is_lenient(encoding):
+        _ENCODING_HINTS[process] = encoding
+    return encoding
@@ -0,0 +1,78 @@
+#
+# csv_jig.py
+# 연속 측정값(예: SemiAssyMaxSolarVolt)을 지그(구분) 대신 사용할 때의 그룹화 전략입니다.
+# 값마다 그룹을 만들면 행 수만큼 그룹/리포트 표가 생기므로, 공정 설정의 jig_bins에 따라 구간으로 묶습니다.
+# - {'method': 'width', 'width': 0.05}: 고정 폭 구간 (origin 기준). 청크/파일마다 같은 구간이 나오므로 스트리밍 가능
+# - {'method': 'quantile', 'count': 10}: 데이터 분위수 구간. 전체 데이터가 필요하므로 일반 분석 전용
+
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+JIG_BIN_METHODS = ('width', 'quantile')
+
+
+def check_jig_bins(bins):
+    """jig_bins 설정이 올바른지 확인하는 함수 (잘못되면 ValueError)"""
+    if bins is None:
+        return
+    method = bins.get('method')
+    if method not in JIG_BIN_METHODS:
+        raise ValueError(f"지원하지 않는 지그 구간 방식입니다: {method} ({', '.join(JIG_BIN_METHODS)} 중 선택)")
+    if method == 'width' and not bins.get('width', 0) > 0:
+        raise ValueError("고정 폭 구간의 width는 0보다 커야 합니다.")
+    if method == 'quantile' and not int(bins.get('count', 0)) >= 1:
+        raise ValueError("분위수 구간의 count는 1 이상이어야 합니다.")
+
+
+def is_streamable_bins(bins):
+    """청크마다 따로 계산해도 같은 구간이 나오는 설정인지 확인하는 함수"""
+    return bins is None or bins['method'] == 'width'
+
+
+def _decimals(step):
+    """구간 이름에 표시할 소수점 자리 수 (폭 0.05 -> 2자리)"""
+    return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+
+
+def _width_bins(numbers, width, origin):
+    """고정 폭 구간 번호와 이름을 구하는 함수"""
+    # 3.25 / 0.05 처럼 부동소수 오차로 경계값이 아래 구간에 들어가지 않도록 작은 여유를 둡니다.
+    index = np.floor((numbers - origin) / width + 1e-9)
+    codes, uniques = pd.factorize(index, sort=True)
+    digits = _decimals(width)
+    names = [f"{origin + i * width:.{digits}f}~{origin + (i + 1) * width:.{digits}f}" for i in uniques]
+    return codes, names
+
+
+def _quantile_bins(numbers, count):
+    """분위수 구간 번호와 이름을 구하는 함수 (같은 경계가 겹치면 구간 수가 줄어듭니다)"""
+    present = numbers[~np.isnan(numbers)]
+    if len(present) == 0:
+        return np.full(len(numbers), -1), []
+    edges = np.unique(np.quantile(present, np.linspace(0, 1, count + 1)))
+    if len(edges) == 1:
+        edges = np.append(edges, edges[0])
+    index = np.clip(np.searchsorted(edges, numbers, side='right') - 1, 0, len(edges) - 2)
+    codes = np.where(np.isnan(numbers), -1, index)
+    names = [f"{low:g}~{high:g}" for low, high in zip(edges[:-1], edges[1:])]
+    return codes, names
+
+
+def bin_jig_values(series, bins):
+    """측정값 컬럼을 jig_bins 설정에 따라 구간 이름(category)으로 바꾸는 함수
+
+    숫자로 바꿀 수 없는 값과 결측값은 결측(집계 제외)이 됩니다.
+    서로 다른 값(보통 행 수보다 훨씬 적음)에 대해서만 숫자 변환을 수행합니다.
+    """
+    check_jig_bins(bins)
+    value_codes, uniques = pd.factorize(series)
+    unique_numbers = pd.to_numeric(pd.Series(np.asarray(uniques, dtype=object)), errors='coerce').to_numpy(dtype=float)
+    numbers = np.append(unique_numbers, np.nan)[value_codes]  # -1 (결측) 코드는 마지막 NaN
+
+    if bins['method'] == 'width':
+        codes, names = _width_bins(numbers, bins['width'], bins.get('origin', 0.0))
+    else:
+        codes, names = _quantile_bins(numbers, int(bins['count']))
+    return pd.Categorical.from_codes(codes, categories=pd.Index(names, dtype=object), ordered=True)
@@ -0,0 +1,148 @@
+#
+# csv_memo.py
+# 분석 결과(컬럼형 결과, 큐브 등)를 프로세스 전체에서 공유하는 메모리 캐시입니다.
+# Streamlit은 모든 브라우저 세션을 한 프로세스의 스레드로 실행하므로, 모듈 전역 캐시는 모든 사용자가 공유합니다.
+# 키는 입력 파일 내용 해시 + 공정 설정(spec) + 분석 방식이므로, 여러 사람이 같은 파일을 열어도 한 번만 계산하고
+# 각 세션은 같은 결과 객체를 참조합니다 (결과는 읽기 전용으로 다룹니다).
+# 전체 크기가 MEMO_MAX_BYTES를 넘으면 오래 사용하지 않은 항목부터, MEMO_TTL_SECONDS가 지난 항목은 만료로 지웁니다.
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import spec_fingerprint
+
+MEMO_MAX_BYTES = int(os.environ.get('CSV_MEMO_MAX_BYTES', 256 * 1024 * 1024))
+MEMO_TTL_SECONDS = float(os.environ.get('CSV_MEMO_TTL_SECONDS', 12 * 60 * 60))
+
+# key -> (value, nbytes, 만료 시각)
+_entries = OrderedDict()
+# 계산 중인 key -> threading.Event (같은 key를 동시에 요청한 세션은 먼저 시작한 계산을 기다립니다)
+_inflight = {}
+_lock = threading.Lock()
+_stats = {'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def source_fingerprint(sources):
+    """입력 파일 목록을 내용 해시로 바꾸는 함수
+
+    업로드 파일(getvalue)은 내용의 해시를, 로컬 폴더 항목(dict)은 경로와 수정 시각을 사용합니다.
+    """
+    digest = hashlib.sha1()
+    for source in sources:
+        if isinstance(source, dict):
+            digest.update(f"{source['path']}:{source['mtime']}".encode('utf-8'))
+        else:
+            digest.update(hashlib.sha1(source.getvalue()).digest())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def memo_key(sources, spec, variant=''):
+    """입력 파일 내용 + 공정 설정 + 분석 방식(variant)으로 공유 캐시 키를 만드는 함수"""
+    return f"{source_fingerprint(sources)}-{spec_fingerprint(spec)}-{variant}"
+
+
+def estimate_nbytes(value):
+    """캐시 항목의 대략적인 메모리 크기를 구하는 함수 (DataFrame/ndarray/dict/list/tuple을 재귀적으로 합산)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(sys.getsizeof(item) for item in value.ravel())
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _evict(max_bytes, now):
+    """만료된 항목과, 크기 제한을 넘는 만큼 오래 사용하지 않은 항목을 지우는 함수 (_lock 안에서 호출)"""
+    for key in [key for key, (_, _, expires) in _entries.items() if expires <= now]:
+        _stats['bytes'] -= _entries.pop(key)[1]
+        _stats['evictions'] += 1
+    while _entries and _stats['bytes'] > max_bytes:
+        _, (_, nbytes, _) = _entries.popitem(last=False)
+        _stats['bytes'] -= nbytes
+        _stats['evictions'] += 1
+
+
+def _lookup(key, now):
+    """만료되지 않은 항목을 찾아 최근 사용으로 옮기는 함수 (_lock 안에서 호출, 없으면 None)"""
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if entry[2] <= now:
+        _stats['bytes'] -= _entries.pop(key)[1]
+        _stats['evictions'] += 1
+        return None
+    _entries.move_to_end(key)
+    return entry
+
+
+def memoized(key, compute, ttl=None, max_bytes=None):
+    """key의 캐시 값이 있으면 반환하고, 없으면 compute()를 한 번만 실행해 저장한 뒤 반환하는 함수
+
+    같은 key를 여러 세션이 동시에 요청하면 하나만 계산하고 나머지는 그 결과를 기다립니다.
+    계산 중 예외가 나면 저장하지 않고 호출한 쪽으로 그대로 전달합니다.
+    크기 제한보다 큰 결과는 저장하지 않고 반환만 합니다.
+    """
+    ttl = MEMO_TTL_SECONDS if ttl is None else ttl
+    max_bytes = MEMO_MAX_BYTES if max_bytes is None else max_bytes
+    while True:
+        with _lock:
+            entry = _lookup(key, time.monotonic())
+            if entry is not None:
+                _stats['hits'] += 1
+                return entry[0]
+            waiting = _inflight.get(key)
+            if waiting is None:
+                _inflight[key] = threading.Event()
+                _stats['misses'] += 1
+                break
+        # 다른 세션이 계산 중이면 끝날 때까지 기다렸다가 다시 찾습니다 (그 계산이 실패했으면 직접 계산).
+        waiting.wait()
+
+    try:
+        value = compute()
+        nbytes = estimate_nbytes(value)
+        with _lock:
+            now = time.monotonic()
+            if nbytes <= max_bytes:
+                _entries[key] = (value, nbytes, now + ttl)
+                _stats['bytes'] += nbytes
+            _evict(max_bytes, now)
+        return value
+    finally:
+        with _lock:
+            _inflight.pop(key).set()
+
+
+def peek_memo(key):
+    """key의 캐시 값을 계산 없이 찾는 함수 (없거나 만료되었으면 None, 적중 통계에는 세지 않음)"""
+    with _lock:
+        entry = _lookup(key, time.monotonic())
+        return None if entry is None else entry[0]
+
+
+def memo_stats():
+    """공유 캐시의 항목 수/크기/적중 통계를 반환하는 함수"""
+    with _lock:
+        return {'entries': len(_entries), **_stats}
+
+
+def clear_memo():
+    """공유 캐시를 모두 비우는 함수"""
+    with _lock:
+        _entries.clear()
+        _stats['bytes'] = 0
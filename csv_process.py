@@ -0,0 +1,687 @@
+#
+# csv_process.py
+# 공정(스테이션)별 CSV의 차이(키워드, Stamp/PC/Pass 컬럼명, 날짜 형식 등)를
+# PROCESS_SPECS 레지스트리에 설정으로만 정의하고,
+# 하나의 공통 리더(read_process_csv)와 분석기(analyze_process_data)로 처리합니다.
+# 새 스테이션은 register_process로 설정만 추가하면 됩니다.
+
+import pandas as pd
+import io
+import codecs
+import hashlib
+import mmap
+import warnings
+
+from csv_cache import cache_key, load_cached_frame, store_cached_frame
+from csv_datetime import parse_timestamps
+from csv_encoding import sniff_encoding
+from csv_jig import bin_jig_values, is_streamable_bins
+from csv_yield import (summarize_yield_table, table_to_summary, yield_partials, yield_table, merge_partials,
+                       replace_cells, pass_codes)
+
+warnings.filterwarnings('ignore')
+
+# 인코딩 판별 시 순서대로 시도할 후보 (csv_encoding.sniff_encoding)
+CANDIDATE_ENCODINGS = ['utf-8-sig', 'utf-8', 'cp949', 'euc-kr', 'latin-1']
+
+# 스트리밍 모드에서 한 번에 읽을 행 수
+DEFAULT_CHUNKSIZE = 200_000
+
+# 증분 분석 시 이전에 읽은 부분이 그대로인지 확인하기 위해 비교하는 끝부분 바이트 수
+APPEND_CHECK_BYTES = 4096
+
+# CSV 파싱 엔진: 'c'는 pandas 기본(단일 스레드), 'pyarrow'는 Arrow 멀티스레드 리더
+# (pyarrow가 없거나 파일에 특이사항이 있으면 자동으로 'c'로 대체)
+DEFAULT_ENGINE = 'c'
+
+
+def _station_spec(prefix, name=None, **overrides):
+    """'{prefix}Stamp', '{prefix}PC', '{prefix}Pass' 컬럼 구조를 가진 표준 스테이션 설정을 만드는 함수"""
+    spec = {
+        'name': name or prefix,
+        'keywords': ['SNumber', f'{prefix}Stamp', f'{prefix}PC', f'{prefix}Pass'],
+        'sn_col': 'SNumber',
+        'stamp_col': f'{prefix}Stamp',
+        'jig_col': f'{prefix}PC',
+        'jig_fallbacks': [],
+        'station_cols': [],
+        'jig_bins': None,
+        'default_jig': None,
+        'pass_col': f'{prefix}Pass',
+        'datetime_format': None,
+        'encodings': CANDIDATE_ENCODINGS,
+        'header_scan_rows': 100,
+        'header_match': 'exact',
+        'skipinitialspace': False,
+        'drop_empty_first_col': False,
+        'clean': 'excel',
+        'clean_columns': None,
+        'require_dates': False,
+        'engine': None,
+        'retest_window': None,
+    }
+    spec.update(overrides)
+    return spec
+
+
+# 공정별 설정 레지스트리
+# - keywords: 헤더 행을 찾을 때 모두 포함되어야 하는 컬럼명
+# - stamp_col / jig_col / pass_col: 날짜, 지그(구분), PASS 여부 컬럼
+# - jig_fallbacks / default_jig: jig_col이 비어 있을 때 대신 사용할 컬럼과 기본값
+# - station_cols: 값이 있으면 jig_col보다 먼저 지그로 사용할 실제 스테이션 ID 컬럼
+# - jig_bins: jig_col이 연속 측정값일 때 구간으로 묶는 방법 (csv_jig 참고, None이면 값 그대로)
+# - datetime_format: None이면 샘플로 형식을 추론 (csv_datetime.infer_datetime_format)
+# - encodings: 인코딩 판별 시 순서대로 시도할 후보
+# - header_match: 'exact'는 셀 값 일치, 'contains'는 키워드 포함 여부로 헤더 판단
+# - clean: 'excel'은 ="..." 형태만, 'quoted'는 "..." / ""..."" 까지 정리
+# - clean_columns: None이면 분석에 쓰는 컬럼(SNumber/Stamp/PC/Pass)만, 리스트면 해당 컬럼만 정리
+# - engine: None이면 DEFAULT_ENGINE, 'c' 또는 'pyarrow'
+# - retest_window: None이면 같은 (지그, 날짜) 안의 재검사만 가성불량으로 인정,
+#   '30min'처럼 시간을 주면 지그/날짜와 관계없이 같은 시리얼의 앞뒤 시간 창 안 PASS로 판정
+PROCESS_SPECS = {
+    'Pcb': _station_spec(
+        'Pcb',
+        keywords=['SNumber', 'PcbStartTime', 'PcbMaxIrPwr', 'PcbPass'],
+        stamp_col='PcbStartTime',
+        jig_col='PcbMaxIrPwr',
+    ),
+    'Fw': _station_spec('Fw'),
+    'RfTx': _station_spec('RfTx'),
+    'Batadc': _station_spec('Batadc'),
+    'SemiAssy': _station_spec(
+        'SemiAssy',
+        keywords=['SNumber', 'SemiAssyStartTime', 'SemiAssyMaxSolarVolt', 'SemiAssyPass'],
+        stamp_col='SemiAssyStartTime',
+        jig_col='SemiAssyMaxSolarVolt',
+        jig_fallbacks=['BatadcPC'],
+        station_cols=['SemiAssyPC'],
+        jig_bins={'method': 'width', 'width': 0.05},
+        default_jig='SemiAssy_JIG',
+        datetime_format='%Y%m%d%H%M%S',
+        header_scan_rows=20,
+        header_match='contains',
+        skipinitialspace=True,
+        drop_empty_first_col=True,
+        clean='quoted',
+        require_dates=True,
+    ),
+    # csv_Semi4 형식: SemiAssyMaxSolarVolt 컬럼이 없는 파일도 있어 3개 키워드로 헤더를 찾고,
+    # 지그는 BatadcPC를 먼저 사용합니다.
+    'SemiAssy4': _station_spec(
+        'SemiAssy',
+        name='SemiAssy4',
+        keywords=['SNumber', 'SemiAssyStartTime', 'SemiAssyPass'],
+        stamp_col='SemiAssyStartTime',
+        jig_col='SemiAssyMaxSolarVolt',
+        station_cols=['BatadcPC', 'SemiAssyPC'],
+        jig_bins={'method': 'width', 'width': 0.05},
+        default_jig='SemiAssy_JIG',
+        datetime_format='%Y%m%d%H%M%S',
+        header_scan_rows=20,
+        header_match='contains',
+        drop_empty_first_col=True,
+        clean='quoted',
+        require_dates=True,
+    ),
+    # csv_Semi2 형식: 날짜 형식은 샘플로 추론하고, 헤더는 셀 값이 정확히 일치하는 행으로 찾으며,
+    # 지그는 SemiAssyMaxSolarVolt 값을 그대로 사용합니다.
+    'SemiAssy2': _station_spec(
+        'SemiAssy',
+        name='SemiAssy2',
+        keywords=['SNumber', 'SemiAssyStartTime', 'SemiAssyMaxSolarVolt', 'SemiAssyPass'],
+        stamp_col='SemiAssyStartTime',
+        jig_col='SemiAssyMaxSolarVolt',
+    ),
+}
+
+
+def register_process(name, prefix=None, **overrides):
+    """새 공정(스테이션) 설정을 레지스트리에 추가하는 함수
+
+    prefix만 주면 '{prefix}Stamp', '{prefix}PC', '{prefix}Pass' 구조로 설정되며,
+    나머지 항목은 overrides로 덮어쓸 수 있습니다.
+    """
+    PROCESS_SPECS[name] = _station_spec(prefix or name, name=name, **overrides)
+    return PROCESS_SPECS[name]
+
+
+def get_process_spec(process):
+    """공정 이름(또는 설정 dict)으로 공정 설정을 반환하는 함수"""
+    if isinstance(process, dict):
+        return process
+    try:
+        return PROCESS_SPECS[process]
+    except KeyError:
+        raise ValueError(f"등록되지 않은 공정입니다: {process}")
+
+
+# '="...' 형식의 문자열을 정리하는 함수
+def clean_string_format(value):
+    if isinstance(value, str) and value.startswith('="') and value.endswith('"'):
+        return value[2:-1]
+    return value
+
+
+def clean_quoted_string(value):
+    """다양한 형태의 문자열 포맷을 정리하는 함수"""
+    if pd.isna(value):
+        return value
+
+    value_str = str(value).strip()
+
+    # ="값" 형태 처리
+    if value_str.startswith('="') and value_str.endswith('"'):
+        return value_str[2:-1]
+
+    # ""값"" 형태 처리
+    if value_str.startswith('""') and value_str.endswith('""'):
+        return value_str[2:-2]
+
+    # "값" 형태 처리
+    if value_str.startswith('"') and value_str.endswith('"') and len(value_str) > 2:
+        return value_str[1:-1]
+
+    return value_str
+
+
+def clean_column(series, mode='excel'):
+    """컬럼 전체에 대해 엑셀 아티팩트(="...", ""..."", "...")를 벡터 연산으로 정리하는 함수
+
+    문자열 컬럼만 처리하며, 아티팩트가 있는 행만 잘라내므로 정리할 것이 없으면 원본을 그대로 반환합니다.
+    ('excel'은 clean_string_format, 'quoted'는 clean_quoted_string과 같은 결과)
+    """
+    if not (pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series)):
+        return series
+
+    if mode == 'quoted':
+        # 숫자 등 문자열이 아닌 값도 clean_quoted_string처럼 문자열로 바꾼 뒤 공백을 제거합니다.
+        if pd.api.types.is_object_dtype(series):
+            series = series.where(series.isna(), series.astype(str))
+        series = series.str.strip()
+    text = series.str
+
+    starts_eq = text.startswith('="').fillna(False).astype(bool)
+    ends_quote = text.endswith('"').fillna(False).astype(bool)
+    excel_mask = starts_eq & ends_quote
+    masks = [(excel_mask, 2, -1)]
+
+    if mode == 'quoted':
+        starts_quote = text.startswith('"').fillna(False).astype(bool)
+        double_mask = ~excel_mask & text.startswith('""').fillna(False).astype(bool) \
+            & text.endswith('""').fillna(False).astype(bool)
+        single_mask = ~excel_mask & ~double_mask & starts_quote & ends_quote \
+            & (text.len().fillna(0) > 2)
+        masks += [(double_mask, 2, -2), (single_mask, 1, -1)]
+
+    if not any(mask.any() for mask, _, _ in masks):
+        return series
+
+    series = series.copy()
+    for mask, start, stop in masks:
+        if mask.any():
+            series[mask] = series[mask].str.slice(start, stop)
+    return series
+
+
+def _jig_candidates(spec):
+    """지그로 사용할 수 있는 컬럼 목록 (station_cols -> jig_col -> jig_fallbacks 순)"""
+    return list(dict.fromkeys(list(spec['station_cols']) + [spec['jig_col']] + list(spec['jig_fallbacks'])))
+
+
+def _analysis_columns(df, spec):
+    """분석에 실제로 사용하는 컬럼 목록을 반환하는 함수"""
+    columns = [spec['sn_col'], spec['stamp_col'], spec['pass_col']] + _jig_candidates(spec)
+    return [col for col in dict.fromkeys(columns) if col in df.columns]
+
+
+def _header_cells(line):
+    """헤더 후보 줄(bytes)을 셀 목록으로 나누는 함수"""
+    # 키워드는 모두 ASCII이므로 latin-1로 디코딩해도 비교에는 영향이 없습니다.
+    text = line.decode('latin-1').rstrip('\r\n')
+    return [cell.strip().strip('"').strip() for cell in text.split(',')]
+
+
+def find_header_offset(raw, spec):
+    """원본 바이트에서 키워드가 모두 포함된 헤더 줄의 시작 위치(byte offset)를 찾는 함수
+
+    pandas로 앞부분을 한 번 더 파싱하지 않고 줄 단위로 바이트를 훑으며,
+    헤더를 찾지 못하면 None을 반환합니다.
+    """
+    keywords = spec['keywords']
+    needles = [kw.encode('ascii') for kw in keywords]
+    size = len(raw)
+    pos = len(codecs.BOM_UTF8) if raw[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+
+    n_lines = 0
+    while pos < size and n_lines < spec['header_scan_rows']:
+        end = raw.find(b'\n', pos)
+        if end == -1:
+            end = size
+        line = raw[pos:end]
+
+        # 바이트 단위로 먼저 걸러낸 뒤, 후보 줄만 셀 단위로 확인합니다.
+        if all(needle in line for needle in needles):
+            cells = [cell for cell in _header_cells(line) if cell != '']
+            if spec['header_match'] == 'contains':
+                matched = all(any(kw in cell for cell in cells) for kw in keywords)
+            else:
+                matched = all(kw in cells for kw in keywords)
+            if matched:
+                return pos
+
+        if line.strip():
+            n_lines += 1
+        pos = end + 1
+    return None
+
+
+def _projection_usecols(raw, offset, spec):
+    """헤더 줄에서 분석에 필요한 컬럼의 위치(usecols)를 계산하는 함수 (찾지 못하면 None = 전체 로드)"""
+    end = raw.find(b'\n', offset)
+    cells = _header_cells(raw[offset:end if end != -1 else len(raw)])
+
+    positions = {}
+    for i, cell in enumerate(cells):
+        positions.setdefault(cell, i)
+    if any(kw not in positions for kw in spec['keywords']):
+        return None
+
+    wanted = list(spec['keywords']) + [spec['sn_col'], spec['stamp_col'], spec['pass_col']] + _jig_candidates(spec)
+    return sorted({positions[col] for col in wanted if col in positions})
+
+
+def _buffer_at(raw, offset):
+    """원본 바이트를 offset 위치부터 읽는 파일 객체를 만드는 함수"""
+    if isinstance(raw, mmap.mmap):
+        # 로컬 폴더에서 연 mmap은 그 자체가 파일 객체이므로 복사하지 않고 위치만 옮깁니다.
+        raw.seek(offset)
+        return raw
+
+    # BytesIO는 bytes 버퍼를 복사하지 않고 공유하므로, seek만으로 헤더부터 읽을 수 있습니다.
+    file_content = io.BytesIO(raw)
+    file_content.seek(offset)
+    return file_content
+
+
+def _fix_columns(df, spec):
+    """로드한 DataFrame의 컬럼 이름/인덱스 컬럼을 정리하는 함수 (키워드 컬럼이 없으면 None)"""
+    if spec['skipinitialspace']:
+        df.columns = df.columns.str.strip()
+
+    # 첫 번째 컬럼이 인덱스인 경우 제거 (헤더의 첫 열이 비어있는 경우)
+    if spec['drop_empty_first_col'] and (pd.isna(df.columns[0]) or str(df.columns[0]).strip() == ''
+                                         or str(df.columns[0]).startswith('Unnamed: 0')):
+        df = df.iloc[:, 1:].copy()
+
+    missing_cols = [col for col in spec['keywords'] if col not in df.columns]
+    if missing_cols:
+        return None
+    return df
+
+
+def _arrow_compatible(spec):
+    """공정 설정상 Arrow CSV 리더로 읽을 수 있는지 확인하는 함수
+
+    구분자 뒤 공백 제거(skipinitialspace)나 비어 있는 첫 인덱스 컬럼 처리는
+    Arrow 리더가 지원하지 않으므로 기존 C 엔진으로 읽습니다.
+    """
+    return not spec['skipinitialspace'] and not spec['drop_empty_first_col']
+
+
+def _read_with_arrow(raw, offset, spec, encoding, usecols=None):
+    """Arrow 멀티스레드 CSV 리더로 DataFrame을 로드하는 함수 (읽을 수 없으면 None)"""
+    names = None
+    if usecols is not None:
+        # Arrow 엔진은 컬럼 위치가 아닌 이름으로만 projection을 지원합니다.
+        end = raw.find(b'\n', offset)
+        cells = _header_cells(raw[offset:end if end != -1 else len(raw)])
+        names = [cells[i] for i in usecols]
+    try:
+        df = pd.read_csv(_buffer_at(raw, offset), header=0, encoding=encoding, encoding_errors='replace',
+                         usecols=names, engine='pyarrow')
+    except (ImportError, ValueError):
+        # pyarrow 미설치, 행마다 컬럼 수가 다른 파일, 헤더 이름 불일치 등
+        return None
+    return _fix_columns(df, spec)
+
+
+def _read_with_encoding(raw, offset, spec, encoding, usecols=None, engine=None):
+    """헤더 위치에서 한 번의 파싱으로 DataFrame을 로드하는 함수 (키워드 컬럼이 없으면 None)"""
+    engine = engine or spec['engine'] or DEFAULT_ENGINE
+    if engine == 'pyarrow' and _arrow_compatible(spec):
+        df = _read_with_arrow(raw, offset, spec, encoding, usecols)
+        if df is not None:
+            return df
+
+    # 인코딩은 미리 판별했으므로, 파일 뒷부분의 잘못된 바이트 때문에 전체를 다시 읽지 않도록 대체 문자로 처리합니다.
+    df = pd.read_csv(_buffer_at(raw, offset), header=0, encoding=encoding, encoding_errors='replace',
+                     skipinitialspace=spec['skipinitialspace'], usecols=usecols)
+    return _fix_columns(df, spec)
+
+
+def read_process_csv(uploaded_file, process, full_columns=False, use_cache=True, engine=None):
+    """공정 설정의 키워드로 헤더를 찾아 DataFrame을 로드하는 함수
+
+    기본값은 분석에 필요한 컬럼(SNumber, Stamp, PC, Pass 등)만 읽는 projection 모드이며,
+    상세/드릴다운 화면처럼 모든 측정 컬럼이 필요할 때만 full_columns=True로 전체를 읽습니다.
+    같은 내용의 파일은 csv_cache의 디스크 캐시에서 바로 로드합니다.
+    engine='pyarrow'이면 Arrow 멀티스레드 리더를 먼저 시도합니다 (None이면 공정 설정/DEFAULT_ENGINE).
+    """
+    spec = get_process_spec(process)
+    raw = uploaded_file.getvalue()
+
+    key = cache_key(raw, spec, 'full' if full_columns else 'analysis') if use_cache else None
+    if key is not None:
+        cached = load_cached_frame(key)
+        if cached is not None:
+            return cached
+
+    offset = find_header_offset(raw, spec)
+    if offset is None:
+        return None
+
+    encoding = sniff_encoding(raw, spec['encodings'], spec['name'])
+    usecols = None if full_columns else _projection_usecols(raw, offset, spec)
+    try:
+        df = _read_with_encoding(raw, offset, spec, encoding, usecols, engine)
+        if df is None and usecols is not None:
+            # 헤더 셀 분리 결과가 pandas 파싱과 다르면 전체 컬럼으로 다시 읽습니다.
+            df = _read_with_encoding(raw, offset, spec, encoding, engine=engine)
+        if df is None:
+            return None
+        df = compact_frame(df, spec)
+    except Exception:
+        return None
+
+    if key is not None:
+        store_cached_frame(key, df)
+    return df
+
+
+def binned_jig_column(spec):
+    """jig_bins로 구간화한 지그 컬럼 이름"""
+    return f"{spec['jig_col']}Bin"
+
+
+def _select_jig_column(df, spec):
+    """지그(구분) 컬럼을 결정하는 함수 (station_cols -> jig_col -> jig_fallbacks -> default_jig 순)
+
+    jig_col이 선택되고 jig_bins가 설정되어 있으면 구간 컬럼 이름(binned_jig_column)을 반환합니다.
+    """
+    for col in spec['station_cols']:
+        if col in df.columns and not df[col].isna().all():
+            return col
+
+    if spec['default_jig'] is None:
+        column = spec['jig_col']
+    else:
+        column = next((col for col in [spec['jig_col']] + list(spec['jig_fallbacks'])
+                       if col in df.columns and not df[col].isna().all()), 'DEFAULT_JIG')
+
+    if column == spec['jig_col'] and spec['jig_bins'] is not None:
+        return binned_jig_column(spec)
+    return column
+
+
+def compact_frame(df, spec):
+    """로드한 DataFrame의 분석 컬럼을 정리하고 메모리를 적게 쓰는 dtype으로 바꾸는 함수
+
+    - 분석 컬럼의 엑셀 아티팩트 정리
+    - Stamp -> datetime64 (NaT로 처리된 행 수는 df.attrs['nat_coerced']), Pass -> int8 PassCode (원본 Pass 컬럼은 category)
+    - 지그(PC) 컬럼 -> category (빈 문자열은 결측 처리), SNumber -> string[pyarrow]
+    - 그 외 정수 측정 컬럼은 가장 작은 정수형으로 downcast
+    이미 변환된 컬럼은 건너뛰므로 여러 번 호출해도 안전합니다.
+    """
+    sn_col, stamp_col, pass_col = spec['sn_col'], spec['stamp_col'], spec['pass_col']
+
+    clean_columns = _analysis_columns(df, spec) if spec['clean_columns'] is None else spec['clean_columns']
+    for col in clean_columns:
+        original = df[col]
+        cleaned = clean_column(original, spec['clean'])
+        if cleaned is not original:
+            df[col] = cleaned
+
+    if stamp_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[stamp_col]):
+        df[stamp_col], n_coerced = parse_timestamps(df[stamp_col], spec['datetime_format'], spec['name'])
+        # 날짜 형식이 맞지 않아 NaT가 된 행 수 (화면에 경고로 표시)
+        df.attrs['nat_coerced'] = {**df.attrs.get('nat_coerced', {}), stamp_col: n_coerced}
+
+    if pass_col in df.columns and 'PassCode' not in df.columns:
+        df['PassCode'] = pass_codes(df[pass_col])
+        df[pass_col] = df[pass_col].astype('category')
+
+    for col in _jig_candidates(spec):
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        # jig 값이 빈 문자열인 경우는 집계에서 제외 (날짜 목록에는 포함)
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            blank_jig = df[col].astype(str).str.strip() == ''
+            df[col] = df[col].mask(blank_jig)
+        df[col] = df[col].astype('category')
+
+    if sn_col in df.columns and pd.api.types.is_object_dtype(df[sn_col]):
+        try:
+            df[sn_col] = df[sn_col].astype('string[pyarrow]')
+        except ImportError:
+            pass
+
+    skip = set(_analysis_columns(df, spec)) | {'PassCode'}
+    for col in df.columns:
+        if col not in skip and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+
+    return df
+
+
+def prepare_process_frame(df, spec, jig_column=None):
+    """문자열 정리, 날짜 변환, PASS 코드 변환, 지그 컬럼 결정을 수행하는 함수
+
+    (정리된 DataFrame, 지그 컬럼명)을 반환합니다.
+    jig_column을 주면 해당 컬럼을 그대로 사용합니다 (청크 단위 처리 시 일관성 유지).
+    """
+    sn_col, stamp_col, pass_col = spec['sn_col'], spec['stamp_col'], spec['pass_col']
+
+    if spec['require_dates']:
+        required_columns = [sn_col, stamp_col, pass_col]
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"필수 컬럼이 없습니다: {missing_columns}")
+
+    # read_process_csv로 읽은 DataFrame은 이미 변환되어 있습니다.
+    if 'PassCode' not in df.columns:
+        df = compact_frame(df, spec)
+
+    if spec['require_dates']:
+        df = df[df[stamp_col].notna()].copy()
+
+    if jig_column is None:
+        jig_column = _select_jig_column(df, spec)
+    if jig_column == 'DEFAULT_JIG':
+        df['DEFAULT_JIG'] = pd.Categorical([spec['default_jig']] * len(df))
+    elif jig_column == binned_jig_column(spec):
+        # 연속 측정값은 값마다 그룹을 만들지 않고 구간 이름으로 묶습니다.
+        df[jig_column] = bin_jig_values(df[spec['jig_col']], spec['jig_bins'])
+
+    return df, jig_column
+
+
+def analyze_process_table(df, process):
+    """공정 설정에 따라 컬럼형 결과(csv_yield.yield_table 형식)를 계산하는 공통 분석 함수"""
+    spec = get_process_spec(process)
+    df, jig_column = prepare_process_frame(df, spec)
+
+    if spec['require_dates'] and len(df) == 0:
+        raise ValueError("유효한 날짜 데이터가 없습니다.")
+
+    # 전체 DataFrame이 있으므로 시리얼별 시도 통계(FPY, 재검사 횟수)도 같은 집계에서 함께 계산합니다.
+    return summarize_yield_table(df, spec['sn_col'], spec['stamp_col'], jig_column,
+                                 retest_window=spec['retest_window'], attempts=True)
+
+
+def analyze_process_data(df, process):
+    """공정 설정에 따라 기존 형식의 (summary_data, all_dates)를 계산하는 공통 분석 함수"""
+    return table_to_summary(analyze_process_table(df, process))
+
+
+def _stream_partials(raw, offset, spec, encoding, chunksize, row_offset=0):
+    """청크 단위로 읽으면서 (지그, 날짜, 시리얼) 부분 집계만 누적하는 함수"""
+    reader = pd.read_csv(_buffer_at(raw, offset), header=0, encoding=encoding, encoding_errors='replace',
+                         skipinitialspace=spec['skipinitialspace'], chunksize=chunksize,
+                         usecols=_projection_usecols(raw, offset, spec))
+
+    partials = None
+    # 청크마다 누적 집계와 합치면 누적 집계 전체를 매번 다시 묶어 비용이 청크 수의 제곱으로 늘어나므로,
+    # 청크 집계를 모아 두었다가 누적 집계만큼 쌓였을 때만 합칩니다 (전체 비용은 행 수에 비례).
+    pending = []
+    pending_rows = 0
+    jig_column = None
+    for chunk in reader:
+        chunk = _fix_columns(chunk, spec)
+        if chunk is None:
+            return None, False
+
+        n_rows = len(chunk)
+        chunk, jig_column = prepare_process_frame(chunk, spec, jig_column)
+        chunk_partials = yield_partials(chunk, spec['sn_col'], spec['stamp_col'], jig_column,
+                                        row_offset=row_offset)
+        pending.append(chunk_partials)
+        pending_rows += len(chunk_partials)
+        if partials is None or pending_rows >= len(partials):
+            partials = merge_partials([partials] + pending)
+            pending, pending_rows = [], 0
+        row_offset += n_rows
+
+    return merge_partials([partials] + pending), True
+
+
+def _check_streamable(spec):
+    """청크/증분 분석이 가능한 설정인지 확인하는 함수"""
+    if spec['retest_window'] is not None:
+        # 시간 창 판정은 시리얼의 모든 시도를 한 번에 봐야 하므로 전체 DataFrame 분석에서만 지원합니다.
+        raise ValueError("재검사 시간 창(retest_window) 판정은 스트리밍/증분 분석에서 지원하지 않습니다.")
+    if not is_streamable_bins(spec['jig_bins']):
+        # 분위수 경계는 전체 데이터로 정해야 청크마다 같은 구간이 나옵니다.
+        raise ValueError("분위수 지그 구간(jig_bins)은 스트리밍/증분 분석에서 지원하지 않습니다.")
+
+
+def stream_process_partials(uploaded_file, process, chunksize=DEFAULT_CHUNKSIZE, row_offset=0):
+    """파일 하나를 청크 단위로 읽어 (partials, found)를 반환하는 함수
+
+    found는 헤더/키워드 컬럼을 찾았는지 여부이고, partials는 merge_partials로
+    다른 파일의 결과와 합칠 수 있는 부분 집계 테이블입니다 (데이터가 없으면 None).
+    row_offset은 여러 파일을 합칠 때 가성불량 시리얼 순서를 유지하기 위한 행 번호 시작값입니다.
+    """
+    spec = get_process_spec(process)
+    _check_streamable(spec)
+    raw = uploaded_file.getvalue()
+    offset = find_header_offset(raw, spec)
+    if offset is None:
+        return None, False
+
+    encoding = sniff_encoding(raw, spec['encodings'], spec['name'])
+    return _stream_partials(raw, offset, spec, encoding, chunksize, row_offset)
+
+
+def analyze_process_stream(uploaded_file, process, chunksize=DEFAULT_CHUNKSIZE):
+    """대용량 파일을 청크 단위로 읽어 컬럼형 결과(yield_table)를 계산하는 함수
+
+    전체 DataFrame을 만들지 않고 청크마다 부분 집계만 누적하므로,
+    메모리 사용량은 파일 크기가 아니라 청크 크기와 (지그, 날짜, 시리얼) 조합 수에 비례합니다.
+    헤더를 찾지 못하면 None을 반환합니다.
+    """
+    spec = get_process_spec(process)
+    partials, found = stream_process_partials(uploaded_file, spec, chunksize)
+    if not found:
+        return None
+
+    if spec['require_dates'] and (partials is None or len(partials) == 0):
+        raise ValueError("유효한 날짜 데이터가 없습니다.")
+    return yield_table(partials)
+
+
+def _append_fingerprint(raw, start, end):
+    """이전에 읽은 구간의 끝부분 해시를 계산하는 함수 (파일 교체/수정 감지용)"""
+    return hashlib.sha1(raw[max(start, end - APPEND_CHECK_BYTES):end]).hexdigest()
+
+
+def _state_matches(state, spec, raw):
+    """이전 증분 상태를 현재 파일에 이어서 사용할 수 있는지 확인하는 함수"""
+    header_offset, header = state['header_offset'], state['header']
+    return (state['process'] == spec['name']
+            and len(raw) >= state['end']
+            and raw[header_offset:header_offset + len(header)] == header
+            and _append_fingerprint(raw, header_offset + len(header), state['end']) == state['fingerprint'])
+
+
+def _merge_appended(partials, new_partials):
+    """추가된 행의 부분 집계를 합치고, 새 행이 들어온 (지그, 날짜) 셀의 행만 따로 반환하는 함수
+
+    새 행이 없는 셀은 그대로 두고 해당 셀의 행만 다시 그룹화하므로, 비용이 누적 데이터 전체가 아니라
+    이번에 바뀐 셀 크기에 비례합니다.
+    """
+    if partials is None or len(partials) == 0:
+        return new_partials, new_partials
+    keys = pd.MultiIndex.from_frame(new_partials[['jig', 'date']]).unique()
+    in_touched = pd.MultiIndex.from_frame(partials[['jig', 'date']]).isin(keys)
+    touched = merge_partials([partials[in_touched], new_partials])
+    return pd.concat([partials[~in_touched], touched], ignore_index=True), touched
+
+
+def _update_summary(summary, touched):
+    """새 행이 들어온 (지그, 날짜) 셀만 다시 계산해 이전 결과에 반영하는 함수"""
+    return replace_cells(summary, yield_table(touched))
+
+
+def analyze_process_incremental(uploaded_file, process, state=None, chunksize=DEFAULT_CHUNKSIZE):
+    """파일에 새로 추가된 행만 읽어 이전 분석 결과를 갱신하는 함수
+
+    state는 이전 호출이 반환한 dict로, 마지막으로 읽은 byte 위치/헤더/인코딩과
+    (지그, 날짜, 시리얼) 부분 집계, 분석 결과를 담습니다. state가 없거나 파일이 교체/수정되었으면
+    처음부터 분석하고, 아니면 추가된 행이 속한 (지그, 날짜) 셀만 다시 계산합니다.
+    기록 중일 수 있는 마지막 줄(줄바꿈으로 끝나지 않은 줄)은 다음 갱신 때 읽습니다.
+    반환값은 (컬럼형 결과(yield_table), state)이며, 헤더를 찾지 못하면 (None, None)입니다.
+    """
+    spec = get_process_spec(process)
+    _check_streamable(spec)
+    raw = uploaded_file.getvalue()
+
+    if state is None or not _state_matches(state, spec, raw):
+        header_offset = find_header_offset(raw, spec)
+        if header_offset is None:
+            return None, None
+        header_end = raw.find(b'\n', header_offset, len(raw)) + 1 or len(raw)
+        state = {
+            'process': spec['name'],
+            'header_offset': header_offset,
+            'header': bytes(raw[header_offset:header_end]),
+            'encoding': sniff_encoding(raw, spec['encodings'], spec['name']),
+            'end': header_end,
+            'rows': 0,
+            'partials': None,
+            'summary': yield_table(None),
+        }
+    else:
+        state = dict(state)
+
+    # raw는 로컬 폴더 파일이면 mmap이므로 (find/rfind가 현재 위치부터 찾고 count가 없음) 범위를 명시합니다.
+    end = raw.rfind(b'\n', 0, len(raw)) + 1
+    if end > state['end']:
+        # 헤더 줄 + 추가된 줄만 파싱하므로 컬럼 위치/정리 규칙은 전체 분석과 같습니다.
+        added = bytes(raw[state['end']:end])
+        appended = state['header'] + added
+        new_partials, found = _stream_partials(appended, 0, spec, state['encoding'], chunksize, state['rows'])
+        if not found:
+            return None, None
+
+        if new_partials is not None and len(new_partials) > 0:
+            state['partials'], touched = _merge_appended(state['partials'], new_partials)
+            state['summary'] = _update_summary(state['summary'], touched)
+        # 행 번호는 가성불량 시리얼 순서에만 쓰이므로 줄 수로 증가시켜도 충분합니다.
+        state['rows'] += added.count(b'\n')
+        state['end'] = end
+
+    state['fingerprint'] = _append_fingerprint(raw, state['header_offset'] + len(state['header']), state['end'])
+
+    if spec['require_dates'] and (state['partials'] is None or len(state['partials']) == 0):
+        raise ValueError("유효한 날짜 데이터가 없습니다.")
+    return state['summary'], state
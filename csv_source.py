@@ -0,0 +1,105 @@
+#
+# csv_source.py
+# 브라우저 업로드 대신 검사 PC들이 CSV를 저장하는 공유 폴더에서 직접 파일을 읽습니다.
+# 파일은 mmap으로 열어 read_process_csv / analyze_process_stream에 업로드 파일처럼 전달하므로,
+# 파일 전체를 메모리로 복사하지 않고 OS 페이지 캐시를 그대로 사용합니다.
+# 파일별 헤더 확인 결과는 (경로, 크기, 수정 시각)으로 기억해 두므로, 앱이 다시 실행될 때마다
+# 폴더의 모든 CSV를 다시 열지 않고 새로 생기거나 바뀐 파일만 확인합니다.
+
+import contextlib
+import fnmatch
+import mmap
+import os
+import threading
+from types import SimpleNamespace
+
+from csv_cache import spec_fingerprint
+from csv_process import find_header_offset, get_process_spec
+
+# 기본 감시 폴더 (앱 사이드바에서 변경 가능)
+LOCAL_SOURCE_DIR = os.environ.get('CSV_SOURCE_DIR', '')
+
+# (경로, 공정 설정 해시) -> (크기, 수정 시각, 헤더 일치 여부)
+_header_matches = {}
+_header_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def open_local_file(path):
+    """로컬 파일을 mmap으로 열어 업로드 파일과 같은 형태(name, size, getvalue())로 제공하는 함수
+
+    getvalue()는 복사본이 아닌 읽기 전용 mmap을 반환하며, with 블록이 끝나면 닫힙니다.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # 빈 파일은 mmap으로 열 수 없습니다.
+            yield SimpleNamespace(name=os.path.basename(path), size=0, getvalue=lambda: b'')
+            return
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield SimpleNamespace(name=os.path.basename(path), size=size, getvalue=lambda: mapped)
+        finally:
+            mapped.close()
+
+
+def _matches_process(path, spec):
+    """파일 앞부분에 공정 키워드 헤더가 있는지 확인하는 함수"""
+    try:
+        with open_local_file(path) as local_file:
+            return find_header_offset(local_file.getvalue(), spec) is not None
+    except OSError:
+        return False
+
+
+def _cached_match(path, spec, fingerprint, stat):
+    """크기와 수정 시각이 그대로인 파일은 이전 헤더 확인 결과를, 아니면 새로 확인한 결과를 반환하는 함수"""
+    key = (path, fingerprint)
+    with _header_lock:
+        cached = _header_matches.get(key)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    matched = _matches_process(path, spec)
+    with _header_lock:
+        _header_matches[key] = (stat.st_size, stat.st_mtime_ns, matched)
+    return matched
+
+
+def _prune_header_matches(directory, fingerprint, paths):
+    """폴더에서 사라진 파일의 헤더 확인 결과를 지우는 함수"""
+    # scandir 경로의 상위 폴더와 같은 형태로 비교합니다 (directory 끝의 '/' 유무와 관계없이).
+    parent = os.path.dirname(os.path.join(directory, ''))
+    with _header_lock:
+        stale = [key for key in _header_matches
+                 if key[1] == fingerprint and os.path.dirname(key[0]) == parent and key[0] not in paths]
+        for key in stale:
+            del _header_matches[key]
+
+
+def list_station_files(directory, process=None, pattern='*.csv'):
+    """폴더의 CSV 파일 목록을 최근 수정 순으로 반환하는 함수
+
+    process를 지정하면 헤더 키워드가 맞는 파일만 남깁니다 (새로 생기거나 바뀐 파일만 앞부분 몇 줄 확인).
+    각 항목은 {'path', 'name', 'size', 'mtime'} dict입니다.
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+
+    spec = get_process_spec(process) if process is not None else None
+    fingerprint = spec_fingerprint(spec) if spec is not None else None
+    files = []
+    seen = set()
+    for entry in os.scandir(directory):
+        if not entry.is_file() or not fnmatch.fnmatch(entry.name.lower(), pattern.lower()):
+            continue
+        stat = entry.stat()
+        seen.add(entry.path)
+        if spec is not None and not _cached_match(entry.path, spec, fingerprint, stat):
+            continue
+        files.append({'path': entry.path, 'name': entry.name, 'size': stat.st_size, 'mtime': stat.st_mtime})
+
+    if spec is not None:
+        _prune_header_matches(directory, fingerprint, seen)
+    return sorted(files, key=lambda item: item['mtime'], reverse=True)
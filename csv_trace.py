@@ -0,0 +1,182 @@
+#
+# csv_trace.py
+# 공정별로 따로 분석하던 PCB / Fw / RfTx / SemiAssy / Batadc 검사 기록을 SNumber 기준으로
+# 하나의 로컬 SQLite 저장소에 모읍니다. (SNumber 인덱스)
+# - serial_history: 시리얼 하나의 전체 공정 이력 조회
+# - rolled_throughput_yield: 공정별 1차 수율(FPY)과 누적 수율(RTY)
+# - find_escapes: 앞 공정에서 PASS 하지 못했는데 뒤 공정에서 검사된 시리얼(유출) 탐지
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from csv_process import get_process_spec, prepare_process_frame
+from csv_yield import PASS_CODE, FAIL_CODE
+
+TRACE_DB_PATH = os.environ.get('CSV_TRACE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.csv_trace.sqlite'))
+
+# 다른 세션이 저장 중일 때 쓰기 잠금을 기다리는 최대 시간(초)
+TRACE_BUSY_TIMEOUT = 60
+
+# 생산 라인의 공정 순서 (앞 -> 뒤)
+PROCESS_ORDER = ['Pcb', 'Fw', 'RfTx', 'SemiAssy', 'Batadc']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    process TEXT NOT NULL,
+    sn      TEXT NOT NULL,
+    stamp   TEXT,
+    jig     TEXT,
+    result  INTEGER NOT NULL,
+    source  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_sn ON attempts (sn, process, stamp, result);
+CREATE INDEX IF NOT EXISTS idx_attempts_source ON attempts (source);
+CREATE TABLE IF NOT EXISTS sources (
+    source    TEXT PRIMARY KEY,
+    process   TEXT NOT NULL,
+    n_rows    INTEGER NOT NULL,
+    loaded_at TEXT NOT NULL
+);
+"""
+
+_RESULT_LABELS = {PASS_CODE: 'O', FAIL_CODE: 'X'}
+
+
+def connect_trace_db(path=None):
+    """추적 저장소(SQLite)에 연결하고 테이블/인덱스를 준비하는 함수
+
+    연결은 만든 스레드에서만 사용합니다. 여러 세션(스레드)이 함께 쓰려면 open_trace_db로
+    호출마다 연결을 따로 열어, 한 세션의 트랜잭션이 다른 세션의 행을 커밋/롤백하지 않도록 합니다.
+    """
+    conn = sqlite3.connect(path or TRACE_DB_PATH, timeout=TRACE_BUSY_TIMEOUT)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL 모드에서는 NORMAL로도 DB가 깨지지 않으며, 대량 저장 시 fsync 횟수가 줄어듭니다.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+@contextmanager
+def open_trace_db(path=None):
+    """with 블록 동안만 쓰는 추적 저장소 연결을 여는 함수 (블록이 끝나면 닫힘)"""
+    conn = connect_trace_db(path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def store_process_frame(conn, df, process, source):
+    """read_process_csv로 읽은 DataFrame의 검사 기록을 저장소에 넣는 함수
+
+    같은 source(예: '공정:파일 이름')로 이미 넣은 기록은 지우고 다시 넣으므로,
+    같은 파일을 다시 분석해도 중복되지 않습니다. 저장한 행 수를 반환합니다.
+    """
+    spec = get_process_spec(process)
+    df, jig_column = prepare_process_frame(df, spec)
+
+    serials = df[spec['sn_col']]
+    keep = serials.notna().to_numpy()
+    stamps = df[spec['stamp_col']].dt.strftime('%Y-%m-%d %H:%M:%S')
+    jigs = df[jig_column].astype(str).where(df[jig_column].notna())
+
+    # executemany에는 pandas 값 대신 파이썬 기본 타입 리스트를 넘겨야 행마다 변환 비용이 들지 않습니다.
+    rows = list(zip(
+        [spec['name']] * int(keep.sum()),
+        serials.astype(str).to_numpy(dtype=object)[keep].tolist(),
+        stamps.to_numpy(dtype=object, na_value=None)[keep].tolist(),
+        jigs.to_numpy(dtype=object, na_value=None)[keep].tolist(),
+        df['PassCode'].to_numpy(dtype=np.int64)[keep].tolist(),
+        [source] * int(keep.sum()),
+    ))
+
+    with conn:
+        # 처음부터 쓰기 잠금을 잡아, 동시에 저장하는 다른 연결은 이 트랜잭션이 끝날 때까지 기다립니다.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM attempts WHERE source = ?", (source,))
+        conn.executemany(
+            "INSERT INTO attempts (process, sn, stamp, jig, result, source) VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO sources (source, process, n_rows, loaded_at) VALUES (?, ?, ?, ?)",
+            (source, spec['name'], len(rows), datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
+    return len(rows)
+
+
+def serial_history(conn, sn):
+    """시리얼 하나의 전체 공정 검사 이력을 시간순으로 반환하는 함수"""
+    history = pd.read_sql_query(
+        "SELECT process, stamp, jig, result, source FROM attempts WHERE sn = ? ORDER BY stamp",
+        conn, params=(sn,)
+    )
+    history['result'] = history['result'].map(_RESULT_LABELS).fillna('')
+    return history
+
+
+def _process_order_sql(processes):
+    """공정 순서를 SQL CASE 식으로 만드는 함수"""
+    cases = " ".join(f"WHEN '{name}' THEN {i}" for i, name in enumerate(processes))
+    return f"CASE process {cases} END"
+
+
+def rolled_throughput_yield(conn, processes=PROCESS_ORDER):
+    """공정별 1차 수율(첫 시도에 PASS 한 시리얼 비율)과 누적 수율(RTY)을 계산하는 함수
+
+    반환 DataFrame: process, units, first_pass, fpy, rty (rty는 해당 공정까지의 FPY 곱)
+    """
+    placeholders = ", ".join("?" for _ in processes)
+    # SQLite는 MIN()과 함께 고른 일반 컬럼(result)을 최솟값 행에서 가져오므로, (sn, process, stamp, result)
+    # 커버링 인덱스를 한 번 훑는 것으로 시리얼별 첫 시도 결과를 얻습니다.
+    first_attempts = pd.read_sql_query(
+        f"""
+        SELECT process, COUNT(*) AS units, SUM(result = {PASS_CODE}) AS first_pass
+        FROM (
+            SELECT process, MIN(stamp) AS first_stamp, result
+            FROM attempts
+            WHERE process IN ({placeholders})
+            GROUP BY sn, process
+        )
+        GROUP BY process
+        """,
+        conn, params=list(processes)
+    )
+    order = {name: i for i, name in enumerate(processes)}
+    first_attempts = first_attempts.sort_values('process', key=lambda col: col.map(order)).reset_index(drop=True)
+    first_attempts['fpy'] = first_attempts['first_pass'] / first_attempts['units']
+    first_attempts['rty'] = first_attempts['fpy'].cumprod()
+    return first_attempts
+
+
+def find_escapes(conn, processes=PROCESS_ORDER):
+    """앞 공정에서 한 번도 PASS 하지 못했는데 뒤 공정에서 검사된 시리얼(유출)을 찾는 함수
+
+    반환 DataFrame: sn, failed_process, last_fail, downstream_process, downstream_stamp
+    """
+    order_sql = _process_order_sql(processes)
+    placeholders = ", ".join("?" for _ in processes)
+    return pd.read_sql_query(
+        f"""
+        WITH status AS (
+            SELECT sn, process, {order_sql} AS step,
+                   MAX(result = {PASS_CODE}) AS passed,
+                   MAX(CASE WHEN result = {FAIL_CODE} THEN stamp END) AS last_fail,
+                   MIN(stamp) AS first_stamp
+            FROM attempts
+            WHERE process IN ({placeholders})
+            GROUP BY sn, process
+        )
+        SELECT up.sn, up.process AS failed_process, up.last_fail,
+               down.process AS downstream_process, down.first_stamp AS downstream_stamp
+        FROM status AS up
+        JOIN status AS down ON down.sn = up.sn AND down.step > up.step
+        WHERE up.passed = 0 AND up.last_fail IS NOT NULL
+        ORDER BY up.sn, up.step, down.step
+        """,
+        conn, params=list(processes)
+    )
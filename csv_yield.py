@@ -0,0 +1,406 @@
+#
+# csv_yield.py
+# 공정별 analyze_* 함수가 공통으로 사용하는 수율 집계 엔진입니다.
+# 지그 -> 날짜 -> 시리얼 순의 파이썬 반복문 대신, 정수 코드로 변환한 키에 대해
+# 몇 번의 NumPy 연산으로 (지그, 날짜)별 총 테스트/PASS/가성불량/진성불량/FAIL을 계산합니다.
+
+import pandas as pd
+import numpy as np
+
+PARTIAL_KEYS = ['jig', 'date', 'sn']
+NO_ROW = np.iinfo(np.int64).max
+
+# PassCode 컬럼 값 (int8): 'O' -> PASS, 'X' -> FAIL, 그 외(공백 등) -> OTHER
+PASS_CODE = 1
+FAIL_CODE = 0
+OTHER_CODE = -1
+
+# 재검사 횟수 분포의 마지막 구간 (이 횟수 이상은 한 칸으로 셉니다)
+MAX_RETEST_DEPTH = 3
+RETEST_COLUMNS = [f'n_retest_{depth}' for depth in range(MAX_RETEST_DEPTH + 1)]
+# 시리얼별 시도 통계 부분 집계 컬럼 (시리얼의 첫 시도가 속한 (지그, 날짜) 셀에만 1회 더해집니다)
+ATTEMPT_COLUMNS = ['n_first', 'n_first_pass', 'n_passed', 'n_to_pass'] + RETEST_COLUMNS
+
+
+def pass_codes(series):
+    """PASS 컬럼을 int8 코드(PASS_CODE/FAIL_CODE/OTHER_CODE)로 변환하는 함수
+
+    서로 다른 값(보통 몇 개뿐)에 대해서만 strip/upper를 수행하고 코드로 매핑합니다.
+    """
+    codes, uniques = pd.factorize(series)
+    norm = pd.Index(uniques).astype(str).str.strip().str.upper()
+    lookup = np.where(norm == 'O', PASS_CODE, np.where(norm == 'X', FAIL_CODE, OTHER_CODE)).astype(np.int8)
+    lookup = np.append(lookup, np.int8(OTHER_CODE))  # -1 (결측) 코드용
+    return lookup[codes]
+
+
+def _pass_flags(series):
+    """PASS 컬럼(PassCode 또는 정규화된 'O'/'X' 문자열)에서 (is_pass, is_fail)을 구하는 함수"""
+    if pd.api.types.is_integer_dtype(series):
+        values = series.to_numpy()
+        return values == PASS_CODE, values == FAIL_CODE
+    status = series.to_numpy(dtype=object)
+    return status == 'O', status == 'X'
+
+
+def _first_positions(codes, mask, rows, n_codes):
+    """mask가 True인 행 중 각 코드가 처음 나타난 원본 행 번호를 반환하는 함수 (없으면 NO_ROW)"""
+    first = np.full(n_codes, NO_ROW, dtype=np.int64)
+    positions = np.flatnonzero(mask)
+    if len(positions):
+        # positions는 오름차순이므로 return_index가 곧 첫 등장 위치입니다.
+        uniq, idx = np.unique(codes[positions], return_index=True)
+        first[uniq] = rows[positions[idx]]
+    return first
+
+
+def _take_with_missing(uniques, codes):
+    """factorize 결과에서 -1 코드는 결측값으로 채워 원래 값을 복원하는 함수"""
+    values = pd.Series(uniques).take(np.where(codes >= 0, codes, 0)).to_numpy(dtype=object)
+    values[codes < 0] = np.nan
+    return values
+
+
+def retest_false_defects(sn, stamps, is_pass, is_fail, window):
+    """시리얼별 전체 시도 인덱스로 앞뒤 window 안에 PASS가 있는 FAIL 행(가성불량)을 찾는 함수
+
+    (시리얼, 시각) 순으로 한 번 정렬한 뒤, 각 행에서 같은 시리얼의 직전/직후 PASS 시각을
+    누적 max/min으로 구하므로 지그나 날짜가 달라도 재검사로 인정됩니다.
+    """
+    sn_codes, _ = pd.factorize(sn)
+    times = np.asarray(stamps, dtype='datetime64[us]').view(np.int64)
+    window = pd.Timedelta(window) // pd.Timedelta(microseconds=1)
+
+    order = np.lexsort((times, sn_codes))
+    s_sn, s_times, s_pass = sn_codes[order], times[order], is_pass[order]
+    n = len(order)
+    positions = np.arange(n)
+
+    prev_pass = np.maximum.accumulate(np.where(s_pass, positions, -1)) if n else positions
+    next_pass = np.minimum.accumulate(np.where(s_pass, positions, n)[::-1])[::-1] if n else positions
+    prev_safe, next_safe = np.clip(prev_pass, 0, max(n - 1, 0)), np.clip(next_pass, 0, max(n - 1, 0))
+    near_prev = (prev_pass >= 0) & (s_sn[prev_safe] == s_sn) & (s_times - s_times[prev_safe] <= window)
+    near_next = (next_pass < n) & (s_sn[next_safe] == s_sn) & (s_times[next_safe] - s_times <= window)
+
+    flags = np.zeros(n, dtype=bool)
+    flags[order] = is_fail[order] & (s_sn >= 0) & (near_prev | near_next)
+    return flags
+
+
+def attempt_stats(sn, stamps, is_pass, is_fail):
+    """시리얼별 시도 통계(첫 시도 PASS, PASS까지 시도 수, 재검사 횟수)를 행 단위 가중치로 구하는 함수
+
+    (시리얼, 시각) 순으로 한 번 정렬한 뒤 시리얼이 바뀌는 위치로 런(run)을 나누고,
+    런 안의 누적 위치로 시도 번호를 매깁니다. 결과는 ATTEMPT_COLUMNS 이름의 배열 dict이며
+    시리얼의 첫 시도 행에만 값이 있으므로 bincount로 (지그, 날짜) 셀에 더할 수 있습니다.
+    PASS/FAIL 행만 시도로 세고, 시리얼이 없는 행은 제외합니다.
+    """
+    sn_codes, _ = pd.factorize(sn)
+    times = np.asarray(stamps, dtype='datetime64[us]').view(np.int64)
+    tested = np.flatnonzero((is_pass | is_fail) & (sn_codes >= 0))
+    stats = {col: np.zeros(len(sn_codes), dtype=np.int64) for col in ATTEMPT_COLUMNS}
+    if len(tested) == 0:
+        return stats
+
+    # 같은 시각의 시도는 원래 행 순서를 유지합니다 (lexsort는 안정 정렬).
+    order = tested[np.lexsort((times[tested], sn_codes[tested]))]
+    s_sn, s_pass = sn_codes[order], is_pass[order]
+    n = len(order)
+
+    starts = np.flatnonzero(np.concatenate([[True], s_sn[1:] != s_sn[:-1]]))
+    lengths = np.diff(np.append(starts, n))
+    attempt = np.arange(n) - np.repeat(starts, lengths) + 1
+    # PASS가 없는 런은 n + 1 (어떤 시도 번호보다 큼)
+    to_pass = np.minimum.reduceat(np.where(s_pass, attempt, n + 1), starts)
+    passed = to_pass <= n
+
+    first_rows = order[starts]
+    stats['n_first'][first_rows] = 1
+    stats['n_first_pass'][first_rows] = s_pass[starts]
+    stats['n_passed'][first_rows] = passed
+    stats['n_to_pass'][first_rows] = np.where(passed, to_pass, 0)
+    depth = np.minimum(lengths - 1, MAX_RETEST_DEPTH)
+    for value, col in enumerate(RETEST_COLUMNS):
+        stats[col][first_rows] = depth == value
+    return stats
+
+
+def yield_partials(df, sn_col, stamp_col, jig_col, pass_col='PassCode', row_offset=0, retest_window=None,
+                   freq=None, attempts=False, false_flags=None):
+    """(지그, 날짜, 시리얼)별 부분 집계 테이블을 만드는 함수
+
+    반환되는 테이블은 청크/파일 단위로 합칠 수 있는 상태(state)이며,
+    finalize_partials로 기존 summary_data 형식을 만들 수 있습니다.
+    retest_window(예: '30min')를 주면 같은 (지그, 날짜) 안의 PASS 여부 대신
+    같은 시리얼의 앞뒤 retest_window 안 PASS 여부로 가성불량을 판정해 n_false 컬럼에 담습니다.
+    freq(예: 'h')를 주면 날짜 대신 그 단위로 내린 시각을 'date' 컬럼에 담습니다 (csv_bucket 참고).
+    false_flags(false_defect_rows로 미리 판정한 행별 가성불량 여부)를 주면 그 값을 n_false 컬럼에 담으므로,
+    freq 구간을 다시 묶어도 가성불량 판정은 일별 리포트와 같게 유지됩니다.
+    attempts=True이면 attempt_stats의 시리얼별 시도 통계를 ATTEMPT_COLUMNS 컬럼에 담습니다.
+    시도 통계와 retest_window 판정은 시리얼의 모든 시도가 df에 있어야 하므로 청크별 부분 집계에는 쓰지 않습니다.
+    """
+    is_pass, is_fail = _pass_flags(df[pass_col])
+
+    days = df[stamp_col].dt.normalize() if freq is None else df[stamp_col].dt.floor(freq)
+    day_codes, day_values = pd.factorize(days)
+    valid = day_codes >= 0
+
+    jig_codes, jig_values = pd.factorize(df[jig_col])
+    sn_codes, sn_values = pd.factorize(df[sn_col])
+
+    # 세 개의 코드를 하나의 int64 키로 합친 뒤 한 번만 factorize 합니다.
+    # (결측 지그/시리얼은 -1 -> 0 으로 밀어 별도 그룹으로 유지)
+    n_day = max(len(day_values), 1)
+    n_sn = len(sn_values) + 1
+    combined = ((jig_codes[valid].astype(np.int64) + 1) * n_day + day_codes[valid]) * n_sn + (sn_codes[valid] + 1)
+    cell_codes, cell_keys = pd.factorize(combined)
+
+    is_pass = is_pass[valid]
+    is_fail = is_fail[valid]
+    n_cells = len(cell_keys)
+
+    cell_keys = np.asarray(cell_keys, dtype=np.int64)
+    sn_part = cell_keys % n_sn - 1
+    day_part = (cell_keys // n_sn) % n_day
+    jig_part = cell_keys // n_sn // n_day - 1
+
+    # 가성불량 시리얼 목록을 원래 파일 순서대로 보여주기 위한 첫 FAIL 행 위치
+    rows = np.flatnonzero(valid).astype(np.int64) + row_offset
+    first_fail = _first_positions(cell_codes, is_fail, rows, n_cells)
+
+    partials = pd.DataFrame({
+        'jig': _take_with_missing(jig_values, jig_part),
+        'date': np.asarray(day_values)[day_part] if n_cells else np.array([], dtype='datetime64[ns]'),
+        'sn': _take_with_missing(sn_values, sn_part),
+        'n_total': np.bincount(cell_codes, minlength=n_cells).astype(np.int64),
+        'n_pass': np.bincount(cell_codes, weights=is_pass, minlength=n_cells).astype(np.int64),
+        'n_fail': np.bincount(cell_codes, weights=is_fail, minlength=n_cells).astype(np.int64),
+        'first_fail': first_fail,
+    })
+    if false_flags is not None:
+        false_flags = np.asarray(false_flags, dtype=bool)[valid]
+    elif retest_window is not None:
+        false_flags = retest_false_defects(df[sn_col].to_numpy()[valid], df[stamp_col].to_numpy()[valid],
+                                           is_pass, is_fail, retest_window)
+    if false_flags is not None:
+        partials['n_false'] = np.bincount(cell_codes, weights=false_flags, minlength=n_cells).astype(np.int64)
+    if attempts:
+        stats = attempt_stats(df[sn_col].to_numpy()[valid], df[stamp_col].to_numpy()[valid], is_pass, is_fail)
+        for col in ATTEMPT_COLUMNS:
+            partials[col] = np.bincount(cell_codes, weights=stats[col], minlength=n_cells).astype(np.int64)
+    return partials
+
+
+def false_defect_rows(df, sn_col, stamp_col, jig_col, pass_col='PassCode', retest_window=None):
+    """행마다 가성불량으로 판정되는 FAIL인지 표시하는 함수 (finalize_partials와 같은 판정 기준)
+
+    날짜가 없는 행은 집계에서 빠지므로 항상 False입니다.
+    """
+    is_pass, is_fail = _pass_flags(df[pass_col])
+    valid = df[stamp_col].notna().to_numpy()
+    flags = np.zeros(len(df), dtype=bool)
+
+    if retest_window is not None:
+        flags[valid] = retest_false_defects(df[sn_col].to_numpy()[valid], df[stamp_col].to_numpy()[valid],
+                                            is_pass[valid], is_fail[valid], retest_window)
+        return flags
+
+    # 같은 (지그, 날짜) 안에서 한 번이라도 PASS 한 시리얼의 FAIL
+    day_codes, day_values = pd.factorize(df[stamp_col].dt.normalize())
+    jig_codes, _ = pd.factorize(df[jig_col])
+    sn_codes, sn_values = pd.factorize(df[sn_col])
+    n_day, n_sn = max(len(day_values), 1), len(sn_values) + 1
+    combined = ((jig_codes.astype(np.int64) + 1) * n_day + day_codes) * n_sn + (sn_codes + 1)
+    cell_codes, cell_keys = pd.factorize(combined)
+    has_pass = np.bincount(cell_codes, weights=is_pass & valid, minlength=len(cell_keys)) > 0
+    flags = is_fail & valid & (sn_codes >= 0) & has_pass[cell_codes]
+    return flags
+
+
+def merge_partials(partials_list):
+    """여러 부분 집계 테이블을 (지그, 날짜, 시리얼) 기준으로 합치는 함수"""
+    frames = [p for p in partials_list if p is not None and len(p) > 0]
+    if not frames:
+        return None
+    if len(frames) == 1:
+        return frames[0]
+    return regroup_partials(pd.concat(frames, ignore_index=True))
+
+
+def regroup_partials(partials):
+    """같은 (지그, 날짜, 시리얼) 키가 여러 행에 있는 부분 집계 테이블을 키마다 한 행으로 합치는 함수"""
+    aggs = {col: 'sum' for col in partials.columns if col.startswith('n_')}
+    aggs['first_fail'] = 'min'
+    return partials.groupby(PARTIAL_KEYS, dropna=False, sort=False, as_index=False).agg(aggs)
+
+
+TABLE_MEASURES = ['total_test', 'pass', 'false_defect', 'true_defect']
+# 시도 통계 부분 집계 컬럼 -> 컬럼형 결과 컬럼 (yield_partials(attempts=True)로 만든 경우에만 있음)
+ATTEMPT_MEASURES = {col: col[len('n_'):] for col in ATTEMPT_COLUMNS}
+
+
+def _empty_table(all_dates):
+    """셀이 없는 컬럼형 결과를 만드는 함수"""
+    cells = pd.DataFrame({'jig': pd.Series([], dtype=object), 'date': pd.Series([], dtype='datetime64[ns]'),
+                          **{col: pd.Series([], dtype=np.int64) for col in TABLE_MEASURES}})
+    return {'cells': cells, 'sns': np.array([], dtype=object), 'sn_offsets': np.zeros(1, dtype=np.int64),
+            'all_dates': all_dates}
+
+
+def yield_table(partials):
+    """부분 집계 테이블로부터 컬럼형 결과(yield table)를 만드는 함수
+
+    반환 dict:
+    - 'cells': (지그, 날짜)별 한 행 DataFrame (jig, date, total_test, pass, false_defect, true_defect), 지그/날짜 순
+      (시도 통계가 있으면 first, first_pass, passed, to_pass, retest_0.. 컬럼 추가 - attempt_rates 참고)
+    - 'sns': 모든 셀의 가성불량 시리얼을 이어 붙인 배열 (셀 안에서는 첫 FAIL 행 순서)
+    - 'sn_offsets': i번째 셀의 시리얼은 sns[sn_offsets[i]:sn_offsets[i + 1]]
+    - 'all_dates': 날짜 목록 (지그가 없는 행의 날짜 포함)
+    기존 (summary_data, all_dates) 형식이 필요하면 table_to_summary를 사용합니다.
+    """
+    if partials is None or len(partials) == 0:
+        return _empty_table([])
+
+    all_dates = sorted(pd.DatetimeIndex(partials['date'].unique()).date)
+
+    cells = partials[partials['jig'].notna()]
+    if len(cells) == 0:
+        return _empty_table(all_dates)
+
+    n_fail = cells['n_fail'].to_numpy()
+    if 'n_false' in cells.columns:
+        # 행 단위로 미리 판정한 가성불량 (yield_partials의 retest_window / false_flags)
+        false_defect = cells['n_false'].to_numpy()
+    else:
+        # 같은 (지그, 날짜) 안에서 한 번이라도 PASS 한 시리얼의 FAIL은 가성불량
+        has_pass = (cells['n_pass'].to_numpy() > 0) & cells['sn'].notna().to_numpy()
+        false_defect = np.where(has_pass, n_fail, 0)
+
+    work = pd.DataFrame({
+        'jig': cells['jig'].to_numpy(),
+        'date': cells['date'].to_numpy(),
+        'total_test': cells['n_total'].to_numpy(),
+        'pass': cells['n_pass'].to_numpy(),
+        'false_defect': false_defect,
+        'true_defect': n_fail - false_defect,
+        **{name: cells[col].to_numpy() for col, name in ATTEMPT_MEASURES.items() if col in cells.columns},
+    })
+    counts = work.groupby(['jig', 'date'], sort=True).sum()
+
+    # 가성불량 시리얼은 (셀, 첫 FAIL 행) 순으로 정렬해 셀별 구간으로 이어 붙입니다.
+    fd_cells = cells[false_defect > 0]
+    cell_index = counts.index.get_indexer(pd.MultiIndex.from_arrays([fd_cells['jig'], fd_cells['date']]))
+    order = np.lexsort((fd_cells['first_fail'].to_numpy(), cell_index))
+    sn_counts = np.bincount(cell_index, minlength=len(counts))
+
+    return {
+        'cells': counts.reset_index(),
+        'sns': fd_cells['sn'].to_numpy(dtype=object)[order],
+        'sn_offsets': np.concatenate([[0], np.cumsum(sn_counts)]).astype(np.int64),
+        'all_dates': all_dates,
+    }
+
+
+def select_cells(table, rows):
+    """컬럼형 결과에서 rows 위치의 셀만 (시리얼 구간과 함께) 골라내는 함수"""
+    rows = np.asarray(rows, dtype=np.int64)
+    offsets = table['sn_offsets']
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    new_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    positions = np.arange(new_offsets[-1]) + np.repeat(starts - new_offsets[:-1], lengths)
+    return {
+        'cells': table['cells'].iloc[rows].reset_index(drop=True),
+        'sns': table['sns'][positions],
+        'sn_offsets': new_offsets,
+        'all_dates': table['all_dates'],
+    }
+
+
+def replace_cells(table, update):
+    """update에 있는 (지그, 날짜) 셀은 새 값으로 바꾸고 나머지 셀은 그대로 둔 컬럼형 결과를 만드는 함수"""
+    old_keys = pd.MultiIndex.from_frame(table['cells'][['jig', 'date']])
+    new_keys = pd.MultiIndex.from_frame(update['cells'][['jig', 'date']])
+    kept = select_cells(table, np.flatnonzero(~old_keys.isin(new_keys)))
+
+    n_kept = len(kept['sns'])
+    combined = {
+        'cells': pd.concat([kept['cells'], update['cells']], ignore_index=True),
+        'sns': np.concatenate([kept['sns'], update['sns']]),
+        'sn_offsets': np.concatenate([kept['sn_offsets'], update['sn_offsets'][1:] + n_kept]),
+        'all_dates': sorted(set(table['all_dates']) | set(update['all_dates'])),
+    }
+    order = combined['cells'].sort_values(['jig', 'date'], kind='stable').index.to_numpy()
+    return select_cells(combined, order)
+
+
+def attempt_rates(cells):
+    """컬럼형 결과 셀의 시도 통계로 FPY(%)와 PASS까지 평균 시도 수를 계산하는 함수 (통계가 없으면 None)
+
+    반환 DataFrame은 cells와 같은 행 순서이며 fpy, avg_to_pass, retest_0.. 컬럼을 가집니다.
+    시리얼은 첫 시도가 속한 셀에서만 세므로, 셀의 first는 그 셀에서 처음 검사된 시리얼 수입니다.
+    """
+    if 'first' not in cells.columns:
+        return None
+    first = cells['first'].where(cells['first'] > 0)
+    passed = cells['passed'].where(cells['passed'] > 0)
+    rates = pd.DataFrame({
+        'fpy': (100 * cells['first_pass'] / first).round(1),
+        'avg_to_pass': (cells['to_pass'] / passed).round(2),
+    }, index=cells.index)
+    for col in RETEST_COLUMNS:
+        rates[ATTEMPT_MEASURES[col]] = cells[ATTEMPT_MEASURES[col]]
+    return rates
+
+
+def cell_serials(table, row):
+    """row번째 셀의 가성불량 시리얼 목록을 반환하는 함수"""
+    return table['sns'][table['sn_offsets'][row]:table['sn_offsets'][row + 1]].tolist()
+
+
+def table_to_summary(table, key_format="%Y-%m-%d"):
+    """컬럼형 결과를 기존 (summary_data, all_dates) 중첩 dict 형식으로 바꾸는 함수 (summary_data 날짜 키는 key_format)"""
+    cells = table['cells']
+    sns = table['sns'].tolist()
+    offsets = table['sn_offsets'].tolist()
+
+    summary_data = {}
+    for row, (jig, d, total_test, pass_count, false_defect_count, true_defect_count) in enumerate(zip(
+            cells['jig'].tolist(),
+            cells['date'],
+            cells['total_test'].tolist(),
+            cells['pass'].tolist(),
+            cells['false_defect'].tolist(),
+            cells['true_defect'].tolist())):
+        rate = 100 * pass_count / total_test if total_test > 0 else 0
+
+        if jig not in summary_data:
+            summary_data[jig] = {}
+        summary_data[jig][d.strftime(key_format)] = {
+            'total_test': total_test,
+            'pass': pass_count,
+            'false_defect': false_defect_count,
+            'true_defect': true_defect_count,
+            'fail': false_defect_count + true_defect_count,
+            'pass_rate': f"{rate:.1f}%",
+            'false_defect_sns': sns[offsets[row]:offsets[row + 1]]
+        }
+
+    return summary_data, table['all_dates']
+
+
+def finalize_partials(partials, key_format="%Y-%m-%d"):
+    """부분 집계 테이블로부터 기존 형식의 (summary_data, all_dates)를 만드는 함수"""
+    return table_to_summary(yield_table(partials), key_format)
+
+
+def summarize_yield_table(df, sn_col, stamp_col, jig_col, pass_col='PassCode', retest_window=None, attempts=False):
+    """DataFrame으로부터 컬럼형 결과(yield_table)를 한 번에 계산하는 함수"""
+    return yield_table(yield_partials(df, sn_col, stamp_col, jig_col, pass_col, retest_window=retest_window,
+                                      attempts=attempts))
+
+
+def summarize_yield(df, sn_col, stamp_col, jig_col, pass_col='PassCode', retest_window=None):
+    """analyze_* 함수들의 (summary_data, all_dates) 결과를 한 번에 계산하는 함수"""
+    return finalize_partials(yield_partials(df, sn_col, stamp_col, jig_col, pass_col,
+                                            retest_window=retest_window))
@@ -3,14 +3,25 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from itertools import chain
 import io
 
 # csv2.py와 csv-b.py에서 함수들을 가져옵니다.
-from csv2 import read_csv_with_dynamic_header, analyze_data
-from csv_Fw import read_csv_with_dynamic_header_for_Fw, analyze_Fw_data
-from csv_RfTx import read_csv_with_dynamic_header_for_RfTx, analyze_RfTx_data
-from csv_Semi import read_csv_with_dynamic_header_for_Semi, analyze_Semi_data
-from csv_Batadc import read_csv_with_dynamic_header_for_Batadc, analyze_Batadc_data
+from csv2 import read_csv_with_dynamic_header
+from csv_Fw import read_csv_with_dynamic_header_for_Fw
+from csv_RfTx import read_csv_with_dynamic_header_for_RfTx
+from csv_Semi import read_csv_with_dynamic_header_for_Semi
+from csv_Batadc import read_csv_with_dynamic_header_for_Batadc
+from csv_process import read_process_csv, get_process_spec, clean_column, analyze_process_incremental, analyze_process_table
+from csv_source import LOCAL_SOURCE_DIR, list_station_files, open_local_file
+from csv_batch import read_process_files, analyze_process_files, iter_process_analyses
+from csv_bucket import DEFAULT_SHIFTS, GRANULARITIES, parse_shift_calendar, bucket_partials, summarize_buckets
+from csv_cube import CUBE_DIMS, DIM_LABELS, MEASURE_LABELS, build_cube, merge_cubes, slice_cube, pivot_cube
+from csv_yield import TABLE_MEASURES, RETEST_COLUMNS, ATTEMPT_MEASURES, MAX_RETEST_DEPTH, attempt_rates
+from csv_drift import METRIC_LABELS as DRIFT_LABELS, detect_drift
+from csv_memo import memo_key, memoized, peek_memo, memo_stats, estimate_nbytes
+from csv_cache import cache_key, spill_frame, load_spilled_frame
+from csv_trace import open_trace_db, store_process_frame, serial_history, rolled_throughput_yield, find_escapes
 
 # to_markdown() 대신 사용할 수동 마크다운 변환 함수
 def df_to_markdown_manual(df, index=False):
@@ -50,38 +61,52 @@ def display_analysis_result(analysis_key, file_name):
         return
 
     # df_result = st.session_state.analysis_results[analysis_key]
-    summary_data, all_dates = st.session_state.analysis_data[analysis_key]
+    table = st.session_state.analysis_data[analysis_key]
     
     st.markdown(f"### '{file_name}' 분석 리포트")
     
-    kor_date_cols = [f"{d.strftime('%y%m%d')}" for d in all_dates]
+    # (셀 날짜 값, 컬럼 이름) 목록 - 기본은 일 단위
+    columns = [(pd.Timestamp(d), d.strftime('%y%m%d')) for d in table['all_dates']]
+    granularity = 'day'
+    if isinstance(st.session_state.analysis_results[analysis_key], dict):
+        granularity = st.radio("집계 단위", list(GRANULARITIES), index=list(GRANULARITIES).index('day'),
+                               format_func=GRANULARITIES.get, horizontal=True, key=f"granularity_{analysis_key}")
+        if granularity != 'day':
+            table, columns = summarize_buckets(get_bucket_partials(analysis_key), granularity,
+                                               st.session_state.shifts)
     
     st.write(f"**분석 시간**: {st.session_state.analysis_time[analysis_key]}")
+    show_drift_alerts(analysis_key, table, granularity)
     st.markdown("---")
 
     all_reports_text = ""
     
-    for jig in sorted(summary_data.keys()):
+    cells = table['cells'].assign(fail=table['cells']['false_defect'] + table['cells']['true_defect'])
+    for jig, jig_cells in cells.groupby('jig', sort=True):
         st.subheader(f"구분: {jig}")
         
-        report_data = {
-            '지표': ['총 테스트 수', 'PASS', '가성불량', '진성불량', 'FAIL']
-        }
-        
-        for date_iso, date_str in zip([d.strftime('%Y-%m-%d') for d in all_dates], kor_date_cols):
-            data_point = summary_data[jig].get(date_iso)
-            if data_point:
-                report_data[date_str] = [
-                    data_point['total_test'],
-                    data_point['pass'],
-                    data_point['false_defect'],
-                    data_point['true_defect'],
-                    data_point['fail']
-                ]
-            else:
-                report_data[date_str] = ['N/A'] * 5
-        
-        report_df = pd.DataFrame(report_data)
+        # 지그의 셀 행을 지표 x 날짜 표로 바꾸고, 데이터가 없는 날짜는 'N/A'
+        by_date = jig_cells.set_index('date')
+        keys = [key for key, _ in columns]
+        values = by_date[TABLE_MEASURES + ['fail']].T
+        values = values.reindex(columns=keys).astype('Int64').astype(object).fillna('N/A')
+        labels = ['총 테스트 수', 'PASS', '가성불량', '진성불량', 'FAIL']
+
+        # 일반 모드 결과에는 같은 집계에서 계산한 시리얼별 시도 통계(첫 시도 날짜 기준)가 함께 들어 있음
+        rates = attempt_rates(by_date)
+        if rates is not None:
+            rates = rates.reindex(keys)
+            extra = [rates['fpy'].map('{:.1f}%'.format, na_action='ignore'),
+                     rates['avg_to_pass'].map('{:.2f}'.format, na_action='ignore')]
+            extra += [rates[ATTEMPT_MEASURES[col]].astype('Int64') for col in RETEST_COLUMNS]
+            # 비율/평균 행이 섞이므로 표 전체를 문자열로 표시
+            values = pd.concat([values, pd.DataFrame(extra).astype(object).fillna('N/A')]).astype(str)
+            labels += ['FPY', 'PASS까지 평균 시도 수']
+            labels += [f"재검사 {depth}회" for depth in range(MAX_RETEST_DEPTH)] + [f"재검사 {MAX_RETEST_DEPTH}회 이상"]
+
+        values.columns = [name for _, name in columns]
+        report_df = values.reset_index(drop=True)
+        report_df.insert(0, '지표', labels)
         
         # 수동으로 만든 함수를 사용해 마크다운 테이블 생성 및 출력
         markdown_table = df_to_markdown_manual(report_df)
@@ -99,26 +124,368 @@ def display_analysis_result(analysis_key, file_name):
         mime="text/plain",
     )
 
-@st.cache_data
+def show_drift_alerts(key, table, granularity):
+    """지그별 불량률 상승(CUSUM) 경보를 표시하는 함수 (새로고침할 때마다 새 구간만 감지 상태에 반영)"""
+    states = st.session_state.drift_state[key]
+    alerts, states[granularity] = detect_drift(table, states.get(granularity))
+    for row in alerts.itertuples():
+        note = " (기록 중인 구간 포함)" if row.provisional else ""
+        st.warning(f"구분 {row.jig}: {DRIFT_LABELS[row.metric]} 상승 감지 - 최근 {row.rate:.1%}, "
+                   f"평활 {row.ewma:.1%}, 기준 {row.baseline:.1%}{note}")
+
+# 읽은 DataFrame은 read_process_csv가 csv_cache의 디스크 캐시(Parquet)에 저장하고 수 ms 만에 다시 로드하므로,
+# st.cache_data로 서버 프로세스 메모리에 계속 들고 있지 않습니다 (세션 데이터를 핸들로 바꾼 효과가 유지되도록).
 def read_pcb_data(uploaded_file):
     return read_csv_with_dynamic_header(uploaded_file)
 
-@st.cache_data
 def read_fw_data(uploaded_file):
     return read_csv_with_dynamic_header_for_Fw(uploaded_file)
 
-@st.cache_data
 def read_rftx_data(uploaded_file):
     return read_csv_with_dynamic_header_for_RfTx(uploaded_file)
 
-@st.cache_data
 def read_semi_data(uploaded_file):
     return read_csv_with_dynamic_header_for_Semi(uploaded_file)
     
-@st.cache_data
 def read_batadc_data(uploaded_file):
     return read_csv_with_dynamic_header_for_Batadc(uploaded_file)
 
+def read_full_data(uploaded_file, process):
+    # 상세 화면에서만 모든 측정 컬럼을 읽습니다.
+    return read_process_csv(uploaded_file, process, full_columns=True)
+
+def read_batch_data(uploaded_files, process, full_columns=False):
+    # 여러 파일은 프로세스 풀에서 파일별로 동시에 읽어 합칩니다.
+    return read_process_files(uploaded_files, process, full_columns=full_columns)
+
+def read_local_data(paths, process, full_columns=False):
+    # 파일이 갱신되면 내용 해시가 달라지므로 디스크 캐시 대신 새로 파싱합니다.
+    return read_process_files(list(paths), process, full_columns=full_columns)
+
+def load_sources(sources, process, read_fn=None, full_columns=False):
+    """선택된 파일들(업로드 파일 또는 로컬 폴더 항목)을 하나의 DataFrame으로 읽는 함수"""
+    if isinstance(sources[0], dict):
+        return read_local_data([item['path'] for item in sources], process, full_columns)
+    if len(sources) == 1:
+        return read_full_data(sources[0], process) if full_columns else read_fn(sources[0])
+    return read_batch_data(sources, process, full_columns)
+
+def run_incremental_analysis(key, source, process):
+    """이전 분석 이후 파일에 추가된 행만 읽어 결과를 갱신하는 함수 (증분 상태는 session_state에 보관)"""
+    state = st.session_state.incremental_state[key]
+    if isinstance(source, dict):
+        with open_local_file(source['path']) as local_file:
+            result, state = analyze_process_incremental(local_file, process, state)
+    else:
+        result, state = analyze_process_incremental(source, process, state)
+    st.session_state.incremental_state[key] = state
+    return result
+
+def store_trace(df, process, names):
+    """읽은 검사 기록을 파일별로 추적 저장소에 넣는 함수 (같은 파일을 다시 넣으면 덮어씀)"""
+    # 세션(스레드)마다 연결을 따로 열어야 동시에 저장하는 세션끼리 트랜잭션이 섞이지 않습니다.
+    with open_trace_db() as conn:
+        if 'SourceFile' in df.columns:
+            return sum(store_process_frame(conn, part.drop(columns='SourceFile'), process, f"{process}:{name}")
+                       for name, part in df.groupby('SourceFile', observed=True))
+        return store_process_frame(conn, df, process, f"{process}:{names[0]}")
+
+def get_bucket_partials(key):
+    """시간/교대/주 집계용 부분 집계를 한 번만 만들어 session_state에 보관하는 함수 (단위를 바꿔도 재사용)"""
+    config = (st.session_state.shifts, st.session_state.retest_window)
+    cached = st.session_state.bucket_partials[key]
+    if cached is None or cached[0] != config:
+        spec = {**get_process_spec(PROCESS_TABS[key][2]), 'retest_window': st.session_state.retest_window}
+        cached = (config, bucket_partials(get_frame(key), spec, st.session_state.shifts))
+        st.session_state.bucket_partials[key] = cached
+    return cached[1]
+
+def analyze_shared(sources, df, spec, table=None):
+    """일반 모드 분석 결과(컬럼형 결과, 큐브)를 모든 세션이 공유하는 캐시에서 찾거나 한 번만 계산하는 함수
+
+    table을 주면(전체 공정 분석의 워커 결과) 분석은 건너뛰고 큐브만 만들어 저장합니다.
+    """
+    def compute():
+        # 통합 피벗 탭에서 원본을 다시 거치지 않도록 (공정, 지그, 날짜, 시간) 건수 큐브를 함께 만들어 둠
+        return (analyze_process_table(df, spec) if table is None else table), build_cube(df, spec)
+    return memoized(memo_key(sources, spec, 'table'), compute)
+
+def spill_rows(key, sources, df):
+    """분석한 원본 행을 디스크에 내려두고 session_state에는 핸들만 저장하는 함수"""
+    spec = get_process_spec(PROCESS_TABS[key][2])
+    if len(sources) == 1 and not isinstance(sources[0], dict):
+        # 업로드 파일 하나는 read_process_csv가 이미 파싱 캐시에 같은 행을 저장했으므로 그 키를 핸들로 씁니다
+        # (디스크에 같은 Parquet를 두 번 쓰지 않음). 워커에서 읽은 경우의 SourceFile은 파일 이름 하나뿐이라 뺍니다.
+        handle = spill_frame(cache_key(sources[0].getvalue(), spec, 'analysis'),
+                             df.drop(columns='SourceFile', errors='ignore'))
+    else:
+        handle = spill_frame(memo_key(sources, spec, 'rows'), df)
+    # 내려둔 파일이 캐시 정리로 지워졌을 때 다시 읽을 입력 파일 (업로드 위젯이 이미 들고 있는 객체)
+    handle['sources'] = list(sources)
+    st.session_state.analysis_results[key] = handle
+
+def get_frame(key):
+    """시간/교대/주 집계처럼 원본 행이 필요할 때만 내려둔 행을 읽는 함수 (파일이 지워졌으면 입력 파일에서 다시 읽음)"""
+    handle = st.session_state.analysis_results[key]
+    df = load_spilled_frame(handle)
+    if df is None:
+        df = load_sources(handle['sources'], PROCESS_TABS[key][2], PROCESS_TABS[key][3])
+        spill_rows(key, handle['sources'], df)
+    return df
+
+def session_memory():
+    """이 세션이 session_state에 보관한 분석 데이터의 대략적인 크기(byte)를 항목별로 구하는 함수"""
+    names = ['analysis_data', 'cubes', 'merged_cube', 'bucket_partials', 'incremental_state', 'drift_state']
+    usage = {name: estimate_nbytes(st.session_state[name]) for name in names if name in st.session_state}
+    # 핸들의 입력 파일 객체는 업로드 위젯이 들고 있는 것과 같으므로 세지 않음
+    usage['analysis_results'] = sum(
+        estimate_nbytes({name: value for name, value in handle.items() if name != 'sources'})
+        if isinstance(handle, dict) else estimate_nbytes(handle)
+        for handle in st.session_state.analysis_results.values())
+    return usage
+
+def trim_session_memory():
+    """세션 보관 데이터가 SESSION_MAX_BYTES를 넘으면 다시 만들 수 있는 시간/교대/주 부분 집계부터 비우는 함수"""
+    usage = session_memory()
+    if sum(usage.values()) <= SESSION_MAX_BYTES:
+        return usage
+    for key in st.session_state.bucket_partials:
+        st.session_state.bucket_partials[key] = None
+    return session_memory()
+
+def save_analysis(key, sources, df, table, cube):
+    """일반 모드 분석 결과(원본 행 핸들, 컬럼형 결과, 큐브)를 session_state에 저장하는 함수"""
+    spill_rows(key, sources, df)
+    st.session_state.bucket_partials[key] = None
+    st.session_state.analysis_data[key] = table
+    st.session_state.cubes[key] = cube
+    st.session_state.analysis_time[key] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def save_stream_result(key, result):
+    """스트리밍/증분 분석 결과를 저장하고, 이전 일반 모드 분석에서 남은 큐브/부분 집계/변화 감지 상태를 비우는 함수"""
+    st.session_state.analysis_results[key] = 'stream'
+    st.session_state.analysis_data[key] = result
+    # 원본 행이 없으므로 큐브와 시간/교대/주 부분 집계는 만들지 않습니다 (피벗 탭에 다른 파일 결과가 남지 않도록).
+    st.session_state.cubes[key] = None
+    st.session_state.bucket_partials[key] = None
+    st.session_state.drift_state[key] = {}
+    st.session_state.analysis_time[key] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def run_all_analyses():
+    """파일이 선택된 모든 공정을 공정마다 워커 하나에서 동시에 읽고 분석하는 함수 (일반 모드)"""
+    spec_of = {key: {**get_process_spec(PROCESS_TABS[key][2]), 'retest_window': st.session_state.retest_window}
+               for key in PROCESS_TABS}
+    selected = {key: sources for key, sources in st.session_state.uploaded_files.items() if sources}
+    if not selected:
+        st.sidebar.warning("분석할 파일이 없습니다. 각 공정 탭에서 파일을 먼저 선택하세요.")
+        return
+
+    # 다른 세션에서 이미 분석한 파일은 공유 캐시 결과를 쓰고, 나머지만 워커에서 분석
+    shared = {key: peek_memo(memo_key(sources, spec_of[key], 'table')) for key, sources in selected.items()}
+    jobs = {
+        key: (spec_of[key], [item['path'] if isinstance(item, dict) else item for item in sources])
+        for key, sources in selected.items() if shared[key] is None
+    }
+
+    def shared_results():
+        for key, result in shared.items():
+            if result is not None:
+                yield key, load_sources(selected[key], PROCESS_TABS[key][2], PROCESS_TABS[key][3]), result[0], None
+
+    progress = st.sidebar.progress(0.0, text=f"공정 {len(selected)}개 분석 중...")
+    started = datetime.now()
+    # 끝난 공정부터 결과를 저장하므로 전체 시간은 합계가 아니라 가장 느린 공정에 가깝습니다.
+    results = chain(shared_results(), iter_process_analyses(jobs) if jobs else [])
+    for done, (key, df, table, error) in enumerate(results, start=1):
+        label = PROCESS_TABS[key][0]
+        if error is not None:
+            st.sidebar.error(f"{label} 분석 실패: {error}")
+        elif df is None:
+            st.sidebar.error(f"{label} 데이터 파일을 읽을 수 없습니다.")
+        else:
+            save_analysis(key, selected[key], df, *analyze_shared(selected[key], df, spec_of[key], table))
+            n_coerced = sum(df.attrs.get('nat_coerced', {}).values())
+            if n_coerced:
+                st.sidebar.warning(f"{label}: 날짜 형식이 맞지 않는 {n_coerced:,}개 행은 NaT로 처리되었습니다.")
+            if st.session_state.trace_mode:
+                store_trace(df, spec_of[key]['name'], [item['name'] if isinstance(item, dict) else item.name
+                                                        for item in st.session_state.uploaded_files[key]])
+        progress.progress(done / len(selected), text=f"{label} 완료 ({done}/{len(selected)})")
+    st.sidebar.success(f"전체 분석 완료 ({(datetime.now() - started).total_seconds():.1f}초)")
+
+# 세션 하나가 session_state에 보관할 분석 데이터 크기 상한 (넘으면 다시 만들 수 있는 부분 집계부터 비움)
+SESSION_MAX_BYTES = 64 * 1024 * 1024
+
+# 탭 키 -> (표시 이름, 공정 설명, 공정 설정 이름, 리더)
+PROCESS_TABS = {
+    'pcb': ("PCB", "Pcb_Process", 'Pcb', read_pcb_data),
+    'fw': ("Fw", "Fw_Process", 'Fw', read_fw_data),
+    'rftx': ("RfTx", "RfTx_Process", 'RfTx', read_rftx_data),
+    'semi': ("Semi", "SemiAssy_Process", 'SemiAssy', read_semi_data),
+    'func': ("Func", "Func_Process", 'Batadc', read_batadc_data),
+}
+
+def run_process_tab(key):
+    """공정 탭 하나의 업로드/분석 실행/결과 표시를 처리하는 함수"""
+    label, process_title, process, read_fn = PROCESS_TABS[key]
+
+    st.header(f"파일 {label} ({process_title})")
+    if st.session_state.local_source_dir:
+        # 로컬 폴더 모드: 업로드 없이 공유 폴더의 파일을 mmap으로 직접 읽음
+        local_files = list_station_files(st.session_state.local_source_dir, process)
+        st.session_state.uploaded_files[key] = st.multiselect(
+            f"파일 {label}를 선택하세요 (여러 개 선택 가능)", local_files, key=f"local_{key}",
+            format_func=lambda item: f"{item['name']} ({datetime.fromtimestamp(item['mtime']).strftime('%Y-%m-%d %H:%M')})"
+        )
+    else:
+        st.session_state.uploaded_files[key] = st.file_uploader(
+            f"파일 {label}를 선택하세요 (여러 개 선택 가능)", type=["csv"], key=f"uploader_{key}",
+            accept_multiple_files=True
+        )
+    sources = st.session_state.uploaded_files[key]
+    if not sources:
+        return
+    names = [item['name'] if isinstance(item, dict) else item.name for item in sources]
+    file_name = names[0] if len(names) == 1 else f"{names[0]} 외 {len(names) - 1}개"
+
+    if st.button(f"파일 {label} 분석 실행", key=f"analyze_{key}"):
+        retest_window = st.session_state.retest_window
+        if retest_window is not None and (st.session_state.incremental_mode or st.session_state.stream_mode):
+            st.info("재검사 시간 창 판정은 전체 데이터가 필요하므로 일반 모드로 분석합니다.")
+
+        if retest_window is None and st.session_state.incremental_mode and len(sources) == 1:
+            # 증분 모드: 같은 파일에 추가된 행만 읽어 바뀐 (지그, 날짜) 셀만 갱신
+            with st.spinner("추가된 데이터 분석 중..."):
+                result = run_incremental_analysis(key, sources[0], process)
+            if result is not None:
+                save_stream_result(key, result)
+                st.success("분석 완료! 결과가 저장되었습니다.")
+            else:
+                st.error(f"{label} 데이터 파일을 읽을 수 없습니다.")
+        elif retest_window is None and st.session_state.stream_mode:
+            # 스트리밍 모드: 원본 DataFrame을 만들지 않고 파일별 청크 부분 집계만 합침
+            with st.spinner("데이터 스트리밍 분석 중..."):
+                result = memoized(memo_key(sources, get_process_spec(process), 'stream'), lambda: analyze_process_files(
+                    [item['path'] if isinstance(item, dict) else item for item in sources], process
+                ))
+            if result is not None:
+                save_stream_result(key, result)
+                st.success("분석 완료! 결과가 저장되었습니다.")
+            else:
+                st.error(f"{label} 데이터 파일을 읽을 수 없습니다.")
+        else:
+            with st.spinner(f"파일 {len(sources)}개 읽는 중..."):
+                df = load_sources(sources, process, read_fn)
+            if df is not None:
+                n_coerced = sum(df.attrs.get('nat_coerced', {}).values())
+                if n_coerced:
+                    st.warning(f"날짜 형식이 맞지 않는 {n_coerced:,}개 행은 날짜 없음(NaT)으로 처리되었습니다.")
+                with st.spinner("데이터 분석 및 저장 중..."):
+                    # retest_window가 있으면 지그/날짜와 관계없이 같은 시리얼의 앞뒤 시간 창 안 PASS를 재검사로 인정
+                    spec = {**get_process_spec(process), 'retest_window': retest_window}
+                    save_analysis(key, sources, df, *analyze_shared(sources, df, spec))
+                if st.session_state.trace_mode:
+                    with st.spinner("시리얼 추적 저장소에 기록 중..."):
+                        n_stored = store_trace(df, process, names)
+                    st.info(f"추적 저장소에 {n_stored:,}개 검사 기록을 저장했습니다.")
+                st.success("분석 완료! 결과가 저장되었습니다.")
+            else:
+                st.error(f"{label} 데이터 파일을 읽을 수 없습니다.")
+
+    # 저장된 결과가 있으면 표시
+    if st.session_state.analysis_results[key] is not None:
+        display_analysis_result(key, file_name)
+        display_detail_view(key, sources)
+
+def display_detail_view(key, sources):
+    """가성불량 시리얼의 원본 측정 데이터를 보여주는 상세 화면 (요청 시에만 전체 컬럼 로드)"""
+    false_defect_sns = sorted(set(st.session_state.analysis_data[key]['sns'].tolist()))
+    if not false_defect_sns:
+        return
+
+    with st.expander("가성불량 시리얼 상세 보기"):
+        sn = st.selectbox("시리얼 번호", false_defect_sns, key=f"detail_sn_{key}")
+        if st.button("원본 데이터 불러오기", key=f"detail_load_{key}"):
+            spec = get_process_spec(PROCESS_TABS[key][2])
+            df_full = load_sources(sources, spec['name'], full_columns=True)
+            if df_full is None:
+                st.error("원본 데이터를 읽을 수 없습니다.")
+                return
+            serials = clean_column(df_full[spec['sn_col']], spec['clean'])
+            st.dataframe(df_full[(serials == sn).fillna(False)])
+
+def get_merged_cube():
+    """공정별 큐브를 합친 결과를 큐브가 바뀔 때만 다시 만들어 session_state에 보관하는 함수"""
+    cubes = [cube for cube in st.session_state.cubes.values() if cube is not None]
+    # 큐브는 st.session_state.cubes가 참조하고 있으므로 id가 같으면 같은 큐브입니다.
+    ids = tuple(id(cube) for cube in cubes)
+    cached = st.session_state.merged_cube
+    if cached is None or cached[0] != ids:
+        cached = (ids, merge_cubes(cubes))
+        st.session_state.merged_cube = cached
+    return cached[1]
+
+def run_cube_tab():
+    """분석한 공정들의 큐브를 합쳐 필터/피벗을 바로 바꿔 보는 탭 (원본 데이터를 다시 읽지 않음)"""
+    st.header("공정 통합 피벗")
+    cube = get_merged_cube()
+    if cube is None:
+        st.info("분석된 공정이 없습니다. 공정 탭에서 일반 모드로 분석을 실행하세요.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    processes = col1.multiselect("공정", cube['process'], default=cube['process'], key="cube_process")
+    jigs = col2.multiselect("지그", cube['jig'], default=cube['jig'], key="cube_jig")
+    first_hour, last_hour = col3.slider("시간대", 0, 23, (0, 23), key="cube_hours")
+    dates = cube['date']
+    if len(dates) > 1:
+        first_date, last_date = st.select_slider("날짜 범위", options=dates, value=(dates[0], dates[-1]),
+                                                 key="cube_dates")
+        dates = [d for d in dates if first_date <= d <= last_date]
+
+    col1, col2, col3 = st.columns(3)
+    index = col1.selectbox("행", CUBE_DIMS, index=CUBE_DIMS.index('jig'), format_func=DIM_LABELS.get,
+                           key="cube_index")
+    columns = col2.selectbox("열", (None,) + CUBE_DIMS, index=1 + CUBE_DIMS.index('date'),
+                             format_func=lambda dim: DIM_LABELS.get(dim, "(없음)"), key="cube_columns")
+    measure = col3.selectbox("지표", list(MEASURE_LABELS), format_func=MEASURE_LABELS.get, key="cube_measure")
+    if index == columns:
+        st.warning("행과 열에 서로 다른 항목을 선택하세요.")
+        return
+
+    sliced = slice_cube(cube, process=processes, jig=jigs, date=dates, hour=range(first_hour, last_hour + 1))
+    table = pivot_cube(sliced, index, columns, measure)
+    # 날짜/지그 라벨은 리포트와 같이 문자열로 표시
+    st.dataframe(table.rename(index=str, columns=str))
+
+def run_trace_tab():
+    """추적 저장소에 모인 전 공정 기록으로 시리얼 이력/누적 수율/유출을 보여주는 탭"""
+    st.header("시리얼 추적 (전 공정)")
+    with open_trace_db() as conn:
+        sources = pd.read_sql_query("SELECT source, process, n_rows, loaded_at FROM sources ORDER BY loaded_at", conn)
+        if sources.empty:
+            st.info("저장된 검사 기록이 없습니다. 사이드바에서 '시리얼 추적 저장소에 저장'을 켜고 공정 파일을 분석하세요.")
+            return
+        with st.expander(f"저장된 파일 {len(sources)}개"):
+            st.dataframe(sources)
+
+        sn = st.text_input("시리얼 번호", key="trace_sn").strip()
+        if sn:
+            history = serial_history(conn, sn)
+            if history.empty:
+                st.warning(f"{sn}의 검사 기록이 없습니다.")
+            else:
+                st.dataframe(history)
+
+        if st.button("누적 수율 / 유출 계산", key="trace_rty"):
+            with st.spinner("전 공정 집계 중..."):
+                rty = rolled_throughput_yield(conn)
+                escapes = find_escapes(conn)
+            st.subheader("공정별 1차 수율(FPY)과 누적 수율(RTY)")
+            st.dataframe(rty)
+            st.subheader(f"앞 공정 미통과 후 뒤 공정 검사 (유출) {len(escapes):,}건")
+            st.dataframe(escapes)
+
 def main():
     st.set_page_config(layout="wide")
     st.title("리모컨 생산 데이터 분석 툴")
@@ -141,98 +508,85 @@ def main():
         st.session_state.analysis_time = {
             'pcb': None, 'fw': None, 'rftx': None, 'semi': None, 'func': None
         }
+    if 'incremental_state' not in st.session_state:
+        st.session_state.incremental_state = {
+            'pcb': None, 'fw': None, 'rftx': None, 'semi': None, 'func': None
+        }
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["파일 PCB 분석", "파일 Fw 분석", "파일 RfTx 분석", "파일 Semi 분석", "파일 Func 분석"])
-
-    with tab1:
-        st.header("파일 PCB (Pcb_Process)")
-        st.session_state.uploaded_files['pcb'] = st.file_uploader("파일 PCB를 선택하세요", type=["csv"], key="uploader_pcb")
-        if st.session_state.uploaded_files['pcb']:
-            if st.button("파일 PCB 분석 실행", key="analyze_pcb"):
-                df = read_pcb_data(st.session_state.uploaded_files['pcb'])
-                if df is not None:
-                    with st.spinner("데이터 분석 및 저장 중..."):
-                        st.session_state.analysis_results['pcb'] = df
-                        st.session_state.analysis_data['pcb'] = analyze_data(df)
-                        st.session_state.analysis_time['pcb'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    st.success("분석 완료! 결과가 저장되었습니다.")
-                else:
-                    st.error("PCB 데이터 파일을 읽을 수 없습니다.")
-
-            if st.session_state.analysis_results['pcb'] is not None:
-                display_analysis_result('pcb', st.session_state.uploaded_files['pcb'].name)
-
-    with tab2:
-        st.header("파일 Fw (Fw_Process)")
-        st.session_state.uploaded_files['fw'] = st.file_uploader("파일 Fw를 선택하세요", type=["csv"], key="uploader_fw")
-        if st.session_state.uploaded_files['fw']:
-            if st.button("파일 Fw 분석 실행", key="analyze_fw"):
-                df = read_fw_data(st.session_state.uploaded_files['fw'])
-                if df is not None:
-                    with st.spinner("데이터 분석 및 저장 중..."):
-                        st.session_state.analysis_results['fw'] = df
-                        st.session_state.analysis_data['fw'] = analyze_Fw_data(df)
-                        st.session_state.analysis_time['fw'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    st.success("분석 완료! 결과가 저장되었습니다.")
-                else:
-                    st.error("Fw 데이터 파일을 읽을 수 없습니다.")
-
-            if st.session_state.analysis_results['fw'] is not None:
-                display_analysis_result('fw', st.session_state.uploaded_files['fw'].name)
-
-    with tab3:
-        st.header("파일 RfTx (RfTx_Process)")
-        st.session_state.uploaded_files['rftx'] = st.file_uploader("파일 RfTx를 선택하세요", type=["csv"], key="uploader_rftx")
-        if st.session_state.uploaded_files['rftx']:
-            if st.button("파일 RfTx 분석 실행", key="analyze_rftx"):
-                df = read_rftx_data(st.session_state.uploaded_files['rftx'])
-                if df is not None:
-                    with st.spinner("데이터 분석 및 저장 중..."):
-                        st.session_state.analysis_results['rftx'] = df
-                        st.session_state.analysis_data['rftx'] = analyze_RfTx_data(df)
-                        st.session_state.analysis_time['rftx'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    st.success("분석 완료! 결과가 저장되었습니다.")
-                else:
-                    st.error("RfTx 데이터 파일을 읽을 수 없습니다.")
-
-            if st.session_state.analysis_results['rftx'] is not None:
-                display_analysis_result('rftx', st.session_state.uploaded_files['rftx'].name)
-
-    with tab4:
-        st.header("파일 Semi (SemiAssy_Process)")
-        st.session_state.uploaded_files['semi'] = st.file_uploader("파일 Semi를 선택하세요", type=["csv"], key="uploader_semi")
-        if st.session_state.uploaded_files['semi']:
-            if st.button("파일 Semi 분석 실행", key="analyze_semi"):
-                df = read_semi_data(st.session_state.uploaded_files['semi'])
-                if df is not None:
-                    with st.spinner("데이터 분석 및 저장 중..."):
-                        st.session_state.analysis_results['semi'] = df
-                        st.session_state.analysis_data['semi'] = analyze_Semi_data(df)
-                        st.session_state.analysis_time['semi'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    st.success("분석 완료! 결과가 저장되었습니다.")
-                else:
-                    st.error("Semi 데이터 파일을 읽을 수 없습니다.")
-
-            if st.session_state.analysis_results['semi'] is not None:
-                display_analysis_result('semi', st.session_state.uploaded_files['semi'].name)
-
-    with tab5:
-        st.header("파일 Func (Func_Process)")
-        st.session_state.uploaded_files['func'] = st.file_uploader("파일 Func를 선택하세요", type=["csv"], key="uploader_func")
-        if st.session_state.uploaded_files['func']:
-            if st.button("파일 Func 분석 실행", key="analyze_func"):
-                df = read_batadc_data(st.session_state.uploaded_files['func'])
-                if df is not None:
-                    with st.spinner("데이터 분석 및 저장 중..."):
-                        st.session_state.analysis_results['func'] = df
-                        st.session_state.analysis_data['func'] = analyze_Batadc_data(df)
-                        st.session_state.analysis_time['func'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    st.success("분석 완료! 결과가 저장되었습니다.")
-                else:
-                    st.error("Func 데이터 파일을 읽을 수 없습니다.")
-            
-            if st.session_state.analysis_results['func'] is not None:
-                display_analysis_result('func', st.session_state.uploaded_files['func'].name)
+    if 'cubes' not in st.session_state:
+        st.session_state.cubes = {
+            'pcb': None, 'fw': None, 'rftx': None, 'semi': None, 'func': None
+        }
+    if 'merged_cube' not in st.session_state:
+        # (공정별 큐브 id 목록, 합친 큐브) - 통합 피벗 탭을 다시 그릴 때마다 합치지 않도록 보관
+        st.session_state.merged_cube = None
+    if 'bucket_partials' not in st.session_state:
+        st.session_state.bucket_partials = {
+            'pcb': None, 'fw': None, 'rftx': None, 'semi': None, 'func': None
+        }
+    if 'drift_state' not in st.session_state:
+        # 공정 -> 집계 단위 -> 변화 감지 상태
+        st.session_state.drift_state = {
+            'pcb': {}, 'fw': {}, 'rftx': {}, 'semi': {}, 'func': {}
+        }
+
+    st.session_state.stream_mode = st.sidebar.checkbox(
+        "대용량 스트리밍 모드", value=False,
+        help="파일 전체를 메모리에 올리지 않고 청크 단위로 읽어 집계합니다."
+    )
+    st.session_state.incremental_mode = st.sidebar.checkbox(
+        "증분 분석 (추가된 행만)", value=False,
+        help="계속 기록 중인 파일을 다시 분석할 때, 지난 분석 이후 추가된 행만 읽어 결과를 갱신합니다. (파일 1개 선택 시)"
+    )
+    retest_minutes = st.sidebar.number_input(
+        "재검사 인정 시간 창 (분)", min_value=0, value=0, step=10,
+        help="0이면 같은 지그/같은 날짜 안의 재검사만 가성불량으로 봅니다. "
+             "값을 주면 지그나 날짜가 달라도 FAIL 전후 이 시간 안에 같은 시리얼이 PASS 하면 가성불량으로 봅니다."
+    )
+    st.session_state.retest_window = f"{retest_minutes}min" if retest_minutes > 0 else None
+    shift_text = st.sidebar.text_input(
+        "교대 시작 시각", value=", ".join(f"{name}={start}" for name, start in DEFAULT_SHIFTS),
+        help="'이름=시작시각'을 쉼표로 구분합니다. 다음 교대 시작 전까지가 한 교대이며, 자정을 넘는 교대는 시작한 날짜에 속합니다."
+    )
+    try:
+        st.session_state.shifts = parse_shift_calendar(shift_text)
+    except ValueError as e:
+        st.sidebar.error(str(e))
+        st.session_state.shifts = DEFAULT_SHIFTS
+    st.session_state.trace_mode = st.sidebar.checkbox(
+        "시리얼 추적 저장소에 저장", value=False,
+        help="일반 모드로 읽은 검사 기록을 SNumber 기준 로컬 DB에 모아 공정 간 이력/누적 수율/유출을 봅니다."
+    )
+    source = st.sidebar.radio("데이터 소스", ["파일 업로드", "로컬 폴더"], index=1 if LOCAL_SOURCE_DIR else 0)
+    st.session_state.local_source_dir = None
+    if source == "로컬 폴더":
+        st.session_state.local_source_dir = st.sidebar.text_input(
+            "CSV 폴더 경로", value=LOCAL_SOURCE_DIR,
+            help="검사 PC들이 CSV를 저장하는 공유 폴더입니다. 파일을 업로드하지 않고 바로 읽습니다."
+        ) or None
+
+    # 파일 선택 위젯은 각 탭 안에 있으므로, 지난 실행에서 선택된 파일(uploaded_files)로 먼저 분석합니다.
+    if st.sidebar.button("전체 공정 분석 실행", key="analyze_all",
+                         help="파일을 선택한 모든 공정을 동시에 분석합니다. (일반 모드)"):
+        run_all_analyses()
+
+    tabs = st.tabs([f"파일 {PROCESS_TABS[key][0]} 분석" for key in PROCESS_TABS] + ["공정 통합 피벗", "시리얼 추적"])
+    for tab, key in zip(tabs, PROCESS_TABS):
+        with tab:
+            run_process_tab(key)
+    with tabs[-2]:
+        run_cube_tab()
+    with tabs[-1]:
+        run_trace_tab()
+
+    # 이번 실행의 분석까지 반영된 공유 캐시 / 세션 메모리 상태
+    stats = memo_stats()
+    st.sidebar.caption(f"공유 분석 캐시: {stats['entries']}개 결과, {stats['bytes'] / 2**20:.1f}MB "
+                       f"(적중 {stats['hits']} / 계산 {stats['misses']})")
+    usage = trim_session_memory()
+    spilled = sum(handle['rows'] for handle in st.session_state.analysis_results.values() if isinstance(handle, dict))
+    st.sidebar.caption(f"이 세션 메모리: {sum(usage.values()) / 2**20:.1f}MB "
+                       f"(원본 {spilled:,}행은 디스크에 보관, 필요할 때만 읽음)")
             
 if __name__ == "__main__":
     main()